@@ -0,0 +1,164 @@
+"""Admission control for the Gemini-backed routes.
+
+Each AI route runs its blocking Gemini call through its own ``Bulkhead``: a
+dedicated thread limiter, so slow LLM calls never take threads from the
+default pool that serves the CRUD routes. Requests that would queue for too
+long are shed with 503, and each client address (and each user it names) has a
+token bucket shared by all AI routes that answers 429 when empty.
+
+Limits are per process; with several workers each one enforces its own.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import anyio
+from fastapi import HTTPException, Request
+
+from app import metrics
+
+AI_MAX_CONCURRENT_CALLS = int(os.getenv("AI_MAX_CONCURRENT_CALLS", "8"))
+AI_MAX_QUEUED_CALLS = int(os.getenv("AI_MAX_QUEUED_CALLS", "16"))
+AI_MAX_QUEUE_SECONDS = float(os.getenv("AI_MAX_QUEUE_SECONDS", "5"))
+AI_RATE_LIMIT_PER_MINUTE = float(os.getenv("AI_RATE_LIMIT_PER_MINUTE", "10"))
+AI_RATE_LIMIT_BURST = int(os.getenv("AI_RATE_LIMIT_BURST", "5"))
+# Proxies in front of the app that append to X-Forwarded-For: Cloud Run's front
+# end adds the address it was connected from, anything to its left was sent by
+# the client. Set to 0 when clients connect directly.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+
+
+def _overloaded(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="O serviço de IA está sobrecarregado. Tente novamente em instantes.",
+        headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+    )
+
+
+class Bulkhead:
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int = AI_MAX_CONCURRENT_CALLS,
+        max_queued: int = AI_MAX_QUEUED_CALLS,
+        max_queue_seconds: float = AI_MAX_QUEUE_SECONDS,
+    ):
+        self.name = name
+        self.max_queued = max_queued
+        self.max_queue_seconds = max_queue_seconds
+        self._slots = anyio.Semaphore(max_concurrent)
+        self._threads = anyio.CapacityLimiter(max_concurrent)
+        self._queued = 0
+
+    async def run(self, func, *args):
+        """Runs ``func`` in this bulkhead's threads, or raises 503 if saturated."""
+        if self._slots.value == 0 and self._queued >= self.max_queued:
+            metrics.AI_REJECTIONS.labels(self.name, "queue_full").inc()
+            raise _overloaded(self.max_queue_seconds)
+
+        acquired = False
+        started = time.perf_counter()
+        self._queued += 1
+        try:
+            with anyio.move_on_after(self.max_queue_seconds):
+                await self._slots.acquire()
+                acquired = True
+        finally:
+            self._queued -= 1
+        metrics.AI_QUEUE_WAIT.labels(self.name).observe(time.perf_counter() - started)
+
+        if not acquired:
+            metrics.AI_REJECTIONS.labels(self.name, "queue_timeout").inc()
+            raise _overloaded(self.max_queue_seconds)
+
+        try:
+            return await anyio.to_thread.run_sync(func, *args, limiter=self._threads)
+        finally:
+            self._slots.release()
+
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        name: str,
+        rate_per_minute: float = AI_RATE_LIMIT_PER_MINUTE,
+        burst: int = AI_RATE_LIMIT_BURST,
+        max_clients: int = 10_000,
+    ):
+        self.name = name
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def retry_after(self, key: str) -> float:
+        """Takes a token for ``key``; returns 0, or the seconds until one is free."""
+        if self.rate <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def check(self, key: str):
+        wait = self.retry_after(key)
+        if wait > 0:
+            metrics.AI_REJECTIONS.labels(self.name, "rate_limited").inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Muitas requisições. Tente novamente em instantes.",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+
+def client_address(request: Request) -> str:
+    """The connecting address as seen by the last trusted proxy.
+
+    Not ``request.client``: app.server runs uvicorn with forwarded_allow_ips="*",
+    which puts the leftmost X-Forwarded-For entry there, and the client picks it.
+    """
+    forwarded = [
+        address.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for address in header.split(",")
+        if address.strip()
+    ]
+    if TRUSTED_PROXY_HOPS > 0 and forwarded:
+        return forwarded[-min(TRUSTED_PROXY_HOPS, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+ai_rate_limiter = TokenBucketLimiter("ai")
+
+
+def check_rate_limit(request: Request, user_id=None):
+    """Charges the AI rate limit to the caller's address, and to its user if known.
+
+    There is no authentication yet, so user ids (the X-User-Id header, or
+    ``user_id`` when the route has one in its body) are chosen by the client and
+    only add per-user fairness; the address bucket is what bounds each client.
+    """
+    ai_rate_limiter.check(f"ip:{client_address(request)}")
+    user_id = user_id if user_id is not None else request.headers.get("x-user-id")
+    if user_id:
+        ai_rate_limiter.check(f"user:{user_id}")
+
+
+coach = Bulkhead("coach")
+suggest_habits = Bulkhead("suggest_habits")
+analyze_meal = Bulkhead("analyze_meal")
@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app import models
+
+ANALYTICS_CACHE_SECONDS = float(os.getenv("ANALYTICS_CACHE_SECONDS", "300"))
+
+
+def current_version(db, user_id: int) -> int:
+    return (
+        db.query(models.User.analytics_version)
+        .filter(models.User.id == user_id)
+        .scalar()
+        or 0
+    )
+
+
+def bump_version(db, user_id: int):
+    """Makes every worker's cached analytics for the user stale.
+
+    Call it in the same transaction as the write it accounts for.
+    """
+    db.query(models.User).filter(models.User.id == user_id).update(
+        {models.User.analytics_version: models.User.analytics_version + 1},
+        synchronize_session=False,
+    )
+
+
+class UserCache:
+    """Per-process memo of analytics results, grouped by user.
+
+    Entries are stored with the user's ``analytics_version`` and only returned
+    for that same version, so a write on any worker or instance (which calls
+    ``bump_version``) invalidates every copy. The TTL bounds memory and how old
+    results relative to today can get.
+    """
+
+    def __init__(self, ttl: float = ANALYTICS_CACHE_SECONDS, max_users: int = 1024):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries: OrderedDict[int, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, key=None, version: int | None = None):
+        with self._lock:
+            entries = self._entries.get(user_id)
+            if entries is None or key not in entries:
+                return None
+            expires, stored_version, value = entries[key]
+            if expires < time.monotonic() or stored_version != version:
+                del entries[key]
+                return None
+            self._entries.move_to_end(user_id)
+            return value
+
+    def set(self, user_id: int, value, key=None, version: int | None = None):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            entries = self._entries.setdefault(user_id, {})
+            entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(user_id)
+            if len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,243 @@
+"""Cross-metric insights: mood, sleep, habits and activity on a per-day grid."""
+
+import datetime
+
+import numpy as np
+from sqlalchemy import (
+    Date,
+    Float,
+    case,
+    cast,
+    func,
+    null,
+    select,
+    type_coerce,
+    union_all,
+)
+
+from app import models
+from app.analytics.cache import UserCache
+
+METRICS = [
+    "mood",
+    "sleep_minutes",
+    "sleep_quality",
+    "habits_completed",
+    "active_minutes",
+]
+# Metrics that are zero, not unknown, on days without rows.
+ZERO_WHEN_MISSING = {"habits_completed", "active_minutes"}
+MOOD_SCORES = {"feliz": 5, "bem": 4, "neutro": 3, "mal": 2, "triste": 1}
+QUALITY_SCORES = {"Ruim": 1, "Ok": 2, "Bom": 3}
+
+# Correlations need this many days where both metrics are present.
+MIN_PAIRED_DAYS = 10
+# Threshold effects need this many days on each side of the threshold.
+MIN_GROUP_DAYS = 5
+# Previous-day thresholds whose effect on mood is reported; None splits at the
+# user's median.
+EFFECT_THRESHOLDS = {
+    "sleep_minutes": 420,
+    "sleep_quality": QUALITY_SCORES["Bom"],
+    "habits_completed": None,
+    "active_minutes": 30,
+}
+EFFECT_CONDITIONS = {
+    "sleep_minutes": lambda threshold: f"{threshold / 60:g}h ou mais de sono",
+    "sleep_quality": lambda threshold: "sono avaliado como Bom",
+    "habits_completed": lambda threshold: f"{threshold:g} ou mais hábitos concluídos",
+    "active_minutes": lambda threshold: f"{threshold:g} min ou mais de atividade",
+}
+
+insights_cache = UserCache()
+
+
+def daily_grid_query(user_id: int, start: datetime.date, end: datetime.date):
+    """One row per day with any data, each metric aggregated in its own branch."""
+    journal = models.JournalEntry.__table__
+    sleep = models.SleepLog.__table__
+    habits = models.HabitDefinition.__table__
+    completions = models.HabitCompletion.__table__
+    activities = models.ActivityLog.__table__
+
+    lower = datetime.datetime.combine(start, datetime.time.min)
+    upper = datetime.datetime.combine(
+        end + datetime.timedelta(days=1), datetime.time.min
+    )
+    empty = cast(null(), Float)
+
+    def row(day, **values):
+        return [type_coerce(day, Date).label("day")] + [
+            values.get(metric, empty).label(metric) for metric in METRICS
+        ]
+
+    sleep_day = func.date(sleep.c.end_time)
+    activity_day = func.date(activities.c.date)
+    branches = union_all(
+        select(
+            *row(
+                journal.c.date,
+                mood=cast(case(MOOD_SCORES, value=journal.c.mood), Float),
+            )
+        ).where(journal.c.user_id == user_id, journal.c.date.between(start, end)),
+        select(
+            *row(
+                sleep_day,
+                sleep_minutes=cast(func.sum(sleep.c.duration_minutes), Float),
+                sleep_quality=cast(
+                    func.avg(case(QUALITY_SCORES, value=sleep.c.quality)), Float
+                ),
+            )
+        )
+        .where(
+            sleep.c.user_id == user_id,
+            sleep.c.end_time >= lower,
+            sleep.c.end_time < upper,
+        )
+        .group_by(sleep_day),
+        select(
+            *row(
+                completions.c.date,
+                habits_completed=cast(func.count(completions.c.id), Float),
+            )
+        )
+        .join(habits, completions.c.habit_id == habits.c.id)
+        .where(habits.c.user_id == user_id, completions.c.date.between(start, end))
+        .group_by(completions.c.date),
+        select(
+            *row(activity_day, active_minutes=func.sum(activities.c.duration)),
+        )
+        .where(
+            activities.c.owner_id == user_id,
+            activities.c.date >= lower,
+            activities.c.date < upper,
+        )
+        .group_by(activity_day),
+    ).subquery()
+
+    return (
+        select(
+            branches.c.day,
+            *(func.max(branches.c[metric]).label(metric) for metric in METRICS),
+        )
+        .group_by(branches.c.day)
+        .order_by(branches.c.day)
+    )
+
+
+def _as_date(value) -> datetime.date:
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def build_grid(rows, start: datetime.date, end: datetime.date) -> np.ndarray:
+    """Dense (days x metrics) matrix over the range; NaN marks unknown values."""
+    grid = np.full(((end - start).days + 1, len(METRICS)), np.nan)
+    for column, metric in enumerate(METRICS):
+        if metric in ZERO_WHEN_MISSING:
+            grid[:, column] = 0.0
+    if rows:
+        offsets = np.fromiter(
+            ((_as_date(row[0]) - start).days for row in rows), dtype=np.int64
+        )
+        values = np.array([row[1:] for row in rows], dtype=float)
+        inside = (offsets >= 0) & (offsets < len(grid))
+        days, columns = np.nonzero(~np.isnan(values) & inside[:, None])
+        grid[offsets[days], columns] = values[days, columns]
+    return grid
+
+
+def pairwise_correlation(a: np.ndarray, b: np.ndarray):
+    """Pearson r between every column of ``a`` and every column of ``b``.
+
+    Each pair only uses the days where both values are present. Returns the
+    (r, paired days) matrices.
+    """
+    present_a, present_b = ~np.isnan(a), ~np.isnan(b)
+    za, zb = np.where(present_a, a, 0.0), np.where(present_b, b, 0.0)
+    fa, fb = present_a.astype(float), present_b.astype(float)
+
+    n = fa.T @ fb
+    sum_a, sum_b = za.T @ fb, fa.T @ zb
+    sum_aa, sum_bb = (za**2).T @ fb, fa.T @ zb**2
+    sum_ab = za.T @ zb
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (n * sum_ab - sum_a * sum_b) / np.sqrt(
+            (n * sum_aa - sum_a**2) * (n * sum_bb - sum_b**2)
+        )
+    return r, n.astype(int)
+
+
+def _correlations(r, n, lag_days, pairs):
+    return [
+        {
+            "metric": METRICS[i],
+            "other_metric": METRICS[j],
+            "lag_days": lag_days,
+            "r": round(float(r[i, j]), 3),
+            "days": int(n[i, j]),
+        }
+        for i, j in pairs
+        if n[i, j] >= MIN_PAIRED_DAYS and np.isfinite(r[i, j])
+    ]
+
+
+def _effects(grid):
+    mood_next = grid[1:, METRICS.index("mood")]
+    effects = []
+    for metric, threshold in EFFECT_THRESHOLDS.items():
+        previous = grid[:-1, METRICS.index(metric)]
+        valid = ~np.isnan(previous) & ~np.isnan(mood_next)
+        if not valid.any():
+            continue
+        if threshold is None:
+            threshold = float(np.median(previous[valid]))
+        above = valid & (previous >= threshold)
+        below = valid & (previous < threshold)
+        if above.sum() < MIN_GROUP_DAYS or below.sum() < MIN_GROUP_DAYS:
+            continue
+
+        mood_above = float(mood_next[above].mean())
+        mood_below = float(mood_next[below].mean())
+        difference = mood_above - mood_below
+        effects.append(
+            {
+                "metric": metric,
+                "threshold": threshold,
+                "mood_above": round(mood_above, 2),
+                "mood_below": round(mood_below, 2),
+                "difference": round(difference, 2),
+                "days_above": int(above.sum()),
+                "days_below": int(below.sum()),
+                "summary": (
+                    f"Seu humor é {abs(difference):.1f} ponto(s) "
+                    f"{'maior' if difference >= 0 else 'menor'} no dia seguinte a "
+                    f"dias com {EFFECT_CONDITIONS[metric](threshold)}."
+                ),
+            }
+        )
+    return sorted(effects, key=lambda effect: -abs(effect["difference"]))
+
+
+def analyze(rows, start: datetime.date, end: datetime.date) -> dict:
+    grid = build_grid(rows, start, end)
+    metrics = range(len(METRICS))
+
+    same_day_r, same_day_n = pairwise_correlation(grid, grid)
+    correlations = _correlations(
+        same_day_r, same_day_n, 0, [(i, j) for i in metrics for j in metrics if i < j]
+    )
+    if len(grid) > 1:
+        # r[i, j] relates metric i on a day to metric j on the day before.
+        lagged_r, lagged_n = pairwise_correlation(grid[1:], grid[:-1])
+        correlations += _correlations(
+            lagged_r, lagged_n, 1, [(i, j) for i in metrics for j in metrics if i != j]
+        )
+    correlations.sort(key=lambda item: -abs(item["r"]))
+
+    return {
+        "days_with_data": len(rows),
+        "correlations": correlations,
+        "effects": _effects(grid) if len(grid) > 1 else [],
+    }
@@ -0,0 +1,153 @@
+"""Sleep analytics over array-backed logs: debt, timing consistency and chronotype.
+
+Clock times are computed in the client's time zone, given as an offset from
+UTC. Each log is assigned to the day its sleep ended (the wake day).
+"""
+
+import datetime
+
+import numpy as np
+
+from app import models
+from app.analytics.cache import UserCache
+
+DEFAULT_TARGET_MINUTES = 480
+DEBT_WINDOW_DAYS = 7
+# Shorter logs are naps: they count towards debt but not towards sleep timing.
+MAIN_SLEEP_MINUTES = 180
+MINUTES_PER_DAY = 1440
+QUALITY_LABELS = [quality.value for quality in models.SleepQualityEnum]
+# Mid-sleep on free days, corrected for oversleep (MCTQ's MSFsc), in hours
+# after midnight.
+EARLY_CHRONOTYPE_HOURS = 3.5
+LATE_CHRONOTYPE_HOURS = 5.5
+
+_EPOCH = datetime.date(1970, 1, 1)
+_EPOCH_WEEKDAY = _EPOCH.weekday()
+
+analytics_cache = UserCache()
+
+
+def _epoch_minutes(moment: datetime.datetime) -> float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.timestamp() / 60
+
+
+def circular_stats(clock_minutes: np.ndarray) -> dict | None:
+    """Mean clock time and spread, treating times as angles on a 24h circle."""
+    if len(clock_minutes) == 0:
+        return None
+
+    angles = clock_minutes * (2 * np.pi / MINUTES_PER_DAY)
+    sin, cos = np.sin(angles).mean(), np.cos(angles).mean()
+    # Identical times can round to a resultant just above 1.
+    resultant = min(float(np.hypot(sin, cos)), 1.0)
+    mean = float(np.arctan2(sin, cos) % (2 * np.pi)) * MINUTES_PER_DAY / (2 * np.pi)
+    spread = (
+        np.sqrt(2 * np.log(1 / max(resultant, 1e-12))) * MINUTES_PER_DAY / (2 * np.pi)
+    )
+    mean = round(mean) % MINUTES_PER_DAY
+    return {
+        "mean_time": f"{mean // 60:02d}:{mean % 60:02d}",
+        "mean_minutes": mean,
+        "std_minutes": round(float(spread), 1),
+        "consistency": round(resultant, 3),
+    }
+
+
+def _chronotype(mid_sleep, durations, wake_days):
+    """Classifies MSFsc, falling back to the overall mid-sleep without free days."""
+    free = (wake_days + _EPOCH_WEEKDAY) % 7 >= 5
+    if free.any() and (~free).any():
+        mid_free = circular_stats(mid_sleep[free])["mean_minutes"]
+        sleep_free = durations[free].mean()
+        sleep_work = durations[~free].mean()
+        if sleep_free > sleep_work:
+            sleep_week = (5 * sleep_work + 2 * sleep_free) / 7
+            mid_free -= (sleep_free - sleep_week) / 2
+    else:
+        mid_free = circular_stats(mid_sleep)["mean_minutes"]
+
+    hours = (
+        (mid_free + MINUTES_PER_DAY / 2) % MINUTES_PER_DAY - MINUTES_PER_DAY / 2
+    ) / 60
+    if hours < EARLY_CHRONOTYPE_HOURS:
+        return "Matutino"
+    if hours > LATE_CHRONOTYPE_HOURS:
+        return "Vespertino"
+    return "Intermediário"
+
+
+def analyze(rows, target_minutes: int, utc_offset_minutes: int) -> dict:
+    """Computes all sleep metrics from ``(start_time, end_time, duration_minutes,
+    quality)`` rows in one pass over NumPy arrays."""
+    count = len(rows)
+    starts = np.fromiter((_epoch_minutes(r[0]) for r in rows), dtype=float, count=count)
+    ends = np.fromiter((_epoch_minutes(r[1]) for r in rows), dtype=float, count=count)
+    durations = np.fromiter((r[2] for r in rows), dtype=float, count=count)
+    qualities = np.array([r[3] for r in rows], dtype=object)
+
+    starts += utc_offset_minutes
+    ends += utc_offset_minutes
+    wake_days = np.floor_divide(ends, MINUTES_PER_DAY).astype(np.int64)
+
+    quality_distribution = {
+        label: int(np.count_nonzero(qualities == label)) for label in QUALITY_LABELS
+    }
+    if count == 0:
+        return {
+            "nights": 0,
+            "average_duration_minutes": None,
+            "sleep_debt_7d_minutes": None,
+            "total_debt_minutes": None,
+            "bedtime": None,
+            "wake_time": None,
+            "midpoint": None,
+            "chronotype": None,
+            "quality_distribution": quality_distribution,
+            "daily": [],
+        }
+
+    # Naps and split nights count towards the day they end on.
+    days, inverse = np.unique(wake_days, return_inverse=True)
+    slept = np.bincount(inverse, weights=durations)
+    deficit = target_minutes - slept
+    cumulative = np.concatenate(([0.0], np.cumsum(deficit)))
+    window_start = np.searchsorted(days, days - DEBT_WINDOW_DAYS + 1)
+    debt_7d = np.maximum(cumulative[1:] - cumulative[window_start], 0)
+
+    main = durations >= MAIN_SLEEP_MINUTES
+    if not main.any():
+        main[:] = True
+    starts, ends, durations, wake_days = (
+        starts[main],
+        ends[main],
+        durations[main],
+        wake_days[main],
+    )
+    mid_sleep = ((starts + ends) / 2) % MINUTES_PER_DAY
+    daily = [
+        {
+            "date": _EPOCH + datetime.timedelta(days=day),
+            "duration_minutes": minutes,
+            "debt_7d_minutes": debt,
+        }
+        for day, minutes, debt in zip(
+            days.tolist(),
+            slept.astype(int).tolist(),
+            np.rint(debt_7d).astype(int).tolist(),
+        )
+    ]
+    return {
+        "nights": int(len(days)),
+        "average_duration_minutes": round(float(slept.mean()), 1),
+        "sleep_debt_7d_minutes": daily[-1]["debt_7d_minutes"],
+        "total_debt_minutes": int(max(round(float(deficit.sum())), 0)),
+        "bedtime": circular_stats(starts % MINUTES_PER_DAY),
+        "wake_time": circular_stats(ends % MINUTES_PER_DAY),
+        "midpoint": circular_stats(mid_sleep),
+        "chronotype": _chronotype(mid_sleep, durations, wake_days),
+        "quality_distribution": quality_distribution,
+        "daily": daily,
+    }
@@ -0,0 +1,137 @@
+"""Weight trend analytics, vectorized over the user's daily series."""
+
+import datetime
+
+import numpy as np
+
+from app.analytics.cache import UserCache
+
+# Smoothing factor of the exponentially smoothed trend (10% per day).
+EMA_ALPHA = 0.1
+# Days of history the weekly rate and the projection are fitted on.
+REGRESSION_DAYS = 28
+# Projections further out than this are not reported.
+MAX_PROJECTION_DAYS = 3 * 365
+# Bounds decay ** -n in exponential_moving_average well inside float range.
+_EMA_BLOCK = 512
+
+trend_cache = UserCache()
+
+
+def daily_means(days: np.ndarray, weights: np.ndarray):
+    """Collapses several logs on the same day into their mean."""
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    sums = np.bincount(inverse, weights=weights)
+    counts = np.bincount(inverse)
+    return unique_days, sums / counts
+
+
+def exponential_moving_average(values: np.ndarray, alpha: float = EMA_ALPHA):
+    """EMA seeded with the first value, computed with cumsum one block at a time.
+
+    Inside a block, ema[k] = decay**(k+1) * prev + alpha * sum(decay**(k-j) * x[j]),
+    which is a scaled cumulative sum.
+    """
+    decay = 1 - alpha
+    powers = decay ** np.arange(1, _EMA_BLOCK + 1)
+    result = np.empty(len(values))
+    previous = values[0] if len(values) else 0.0
+    for start in range(0, len(values), _EMA_BLOCK):
+        block = values[start : start + _EMA_BLOCK]
+        scale = powers[: len(block)]
+        result[start : start + len(block)] = scale * (
+            previous + alpha * np.cumsum(block / scale)
+        )
+        previous = result[start + len(block) - 1]
+    return result
+
+
+def rolling_mean(values: np.ndarray, present: np.ndarray, window: int):
+    """Mean of the present values in each trailing ``window``-day span."""
+    sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(present)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sums[end] - sums[start]) / (counts[end] - counts[start])
+
+
+def analyze(days: np.ndarray, weights: np.ndarray) -> dict:
+    """Computes the target-independent part of the trend from raw logs.
+
+    ``days`` are proleptic ordinals (``date.toordinal()``) of each log.
+    """
+    if len(days) == 0:
+        return {"points": [], "last_day": None, "current_trend_kg": None, "slope": None}
+
+    log_days, log_weights = daily_means(days, weights)
+
+    # Regular daily grid; days without a log are linearly interpolated for the
+    # EMA and ignored by the moving averages.
+    grid = np.arange(log_days[0], log_days[-1] + 1)
+    offsets = log_days - log_days[0]
+    present = np.zeros(len(grid), dtype=bool)
+    present[offsets] = True
+    filled = np.interp(grid, log_days, log_weights)
+
+    trend = exponential_moving_average(filled)[offsets]
+    moving_avg_7d = rolling_mean(filled, present, 7)[offsets]
+    moving_avg_30d = rolling_mean(filled, present, 30)[offsets]
+
+    recent = log_days >= log_days[-1] - REGRESSION_DAYS + 1
+    slope = None
+    if recent.sum() >= 2:
+        slope = float(np.polyfit(log_days[recent], log_weights[recent], 1)[0])
+
+    points = [
+        {
+            "date": datetime.date.fromordinal(day),
+            "weight_kg": weight,
+            "trend_kg": smoothed,
+            "moving_avg_7d": week,
+            "moving_avg_30d": month,
+        }
+        for day, weight, smoothed, week, month in zip(
+            log_days.tolist(),
+            np.round(log_weights, 2).tolist(),
+            np.round(trend, 2).tolist(),
+            np.round(moving_avg_7d, 2).tolist(),
+            np.round(moving_avg_30d, 2).tolist(),
+        )
+    ]
+    return {
+        "points": points,
+        "last_day": int(log_days[-1]),
+        "current_trend_kg": float(trend[-1]),
+        "slope": slope,
+    }
+
+
+def analyze_rows(rows) -> dict:
+    """``analyze`` over ``(log_date, weight_kg)`` rows as returned by the query."""
+    days = np.fromiter(
+        (log_date.toordinal() for log_date, _ in rows), dtype=np.int64, count=len(rows)
+    )
+    weights = np.fromiter((weight for _, weight in rows), dtype=float, count=len(rows))
+    return analyze(days, weights)
+
+
+def project(analysis: dict, target_weight_kg: float | None) -> dict | None:
+    """Extends the recent regression slope from the current trend weight."""
+    slope = analysis["slope"]
+    if slope is None:
+        return None
+
+    current = analysis["current_trend_kg"]
+    projected_date = None
+    if target_weight_kg is not None and slope != 0:
+        days_to_goal = (target_weight_kg - current) / slope
+        if 0 <= days_to_goal <= MAX_PROJECTION_DAYS:
+            projected_date = datetime.date.fromordinal(
+                analysis["last_day"] + int(np.ceil(days_to_goal))
+            )
+    return {
+        "target_weight_kg": target_weight_kg,
+        "projected_date": projected_date,
+        "weight_in_30_days_kg": round(current + slope * 30, 2),
+    }
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -12,6 +13,46 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
 if not SQLALCHEMY_DATABASE_URL:
     raise Exception("DATABASE_URL is not set")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+connect_args = {}
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    connect_args["check_same_thread"] = False
+
+# Set per worker by app.server so all workers together stay under DB_MAX_CONNECTIONS.
+pool_options = {}
+if os.getenv("DB_POOL_SIZE"):
+    pool_options["pool_size"] = int(os.getenv("DB_POOL_SIZE"))
+if os.getenv("DB_MAX_OVERFLOW"):
+    pool_options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW"))
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **pool_options
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+
+def _open_connection():
+    connection = engine.connect()
+    connection.execute(text("SELECT 1"))
+    return connection
+
+
+def warm_up_pool(connections: int | None = None):
+    """Opens pooled connections in parallel so the first requests skip the handshake.
+
+    Defaults to the pool size; set DB_WARMUP_CONNECTIONS=0 to disable.
+    """
+    if connections is None:
+        pool_size = getattr(engine.pool, "size", lambda: 0)()
+        connections = int(os.getenv("DB_WARMUP_CONNECTIONS", pool_size))
+    if connections <= 0:
+        return
+
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        futures = [executor.submit(_open_connection) for _ in range(connections)]
+
+    for future in futures:
+        try:
+            future.result().close()
+        except Exception as e:
+            print(f"Erro ao pré-aquecer conexão com o banco: {e}")
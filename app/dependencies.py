@@ -0,0 +1,9 @@
+from app import database
+
+
+def get_db():
+    db = database.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
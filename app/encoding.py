@@ -0,0 +1,202 @@
+"""Response encoding negotiation: MessagePack via ``Accept`` and gzip/brotli via
+``Accept-Encoding``.
+
+Route results are still validated and serialized by their ``response_model``;
+``NegotiatedResponse`` only picks how the serialized content is written out.
+"""
+
+import os
+import zlib
+from contextvars import ContextVar
+
+import brotli
+import msgpack
+import pydantic_core
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = {
+    MSGPACK_MEDIA_TYPE,
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+}
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+# Low brotli qualities compress about as well as gzip -6 but much faster, which
+# is what dynamic responses need.
+BROTLI_QUALITY = 4
+# Media types that are already compressed.
+INCOMPRESSIBLE_PREFIXES = ("image/", "application/gzip", "application/zip")
+
+_wants_msgpack: ContextVar[bool] = ContextVar("wants_msgpack", default=False)
+
+
+def _parse_quality(header: str) -> dict[str, float]:
+    """Maps each token of an Accept-style header to its q-value."""
+    qualities = {}
+    for part in header.split(","):
+        token, *params = [piece.strip() for piece in part.split(";")]
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[token.lower()] = quality
+    return qualities
+
+
+def prefers_msgpack(accept: str) -> bool:
+    qualities = _parse_quality(accept)
+    msgpack_quality = max(
+        (qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES),
+        default=0.0,
+    )
+    json_quality = max(
+        qualities.get("application/json", 0.0),
+        qualities.get("application/*", 0.0),
+        qualities.get("*/*", 0.0),
+    )
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    qualities = _parse_quality(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    # Listed in order of preference on ties.
+    for encoding in ("br", "gzip"):
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON by default; MessagePack when the request's Accept prefers it."""
+
+    def __init__(self, content=None, *args, **kwargs):
+        super().__init__(content, *args, **kwargs)
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content) -> bytes:
+        if _wants_msgpack.get():
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return msgpack.packb(content)
+        # Bare NaN/Infinity tokens are not JSON; JSONResponse refuses them, and
+        # pydantic_core has no strict mode, so they are written as null.
+        return pydantic_core.to_json(content, inf_nan_mode="null")
+
+
+class ContentNegotiationMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept", "")
+        token = _wants_msgpack.set(prefers_msgpack(accept))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _wants_msgpack.reset(token)
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Compresses responses of at least ``minimum_size`` bytes with br or gzip.
+
+    Streaming responses are compressed chunk by chunk as they are sent.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    @staticmethod
+    def _compressible(headers) -> bool:
+        return "content-encoding" not in headers and not headers.get(
+            "content-type", ""
+        ).startswith(INCOMPRESSIBLE_PREFIXES)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                start, start_message = start_message, None
+                start["headers"] = list(start.get("headers", []))
+                headers = MutableHeaders(raw=start["headers"])
+                if self._compressible(headers):
+                    headers.add_vary_header("Accept-Encoding")
+                    if more_body or len(body) >= self.minimum_size:
+                        compressor = _Compressor(encoding)
+                        headers["Content-Encoding"] = encoding
+                        if more_body:
+                            del headers["Content-Length"]
+                        else:
+                            body = compressor.compress(body) + compressor.finish()
+                            headers["Content-Length"] = str(len(body))
+                            await send(start)
+                            await send({"type": "http.response.body", "body": body})
+                            return
+                await send(start)
+
+            if compressor is None:
+                await send(message)
+                return
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,150 @@
+import csv
+import datetime
+import io
+import json
+import zlib
+
+from sqlalchemy import select
+
+from app import database, models
+
+# Rows fetched per round trip. On Postgres, yield_per streams the results
+# through a server-side cursor, so memory stays flat however large the account.
+YIELD_PER = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+def _user_queries(user_id: int):
+    users = models.User.__table__
+    journal = models.JournalEntry.__table__
+    habits = models.HabitDefinition.__table__
+    completions = models.HabitCompletion.__table__
+    activities = models.ActivityLog.__table__
+    nutrition = models.NutritionLog.__table__
+    food_items = models.FoodItem.__table__
+    water = models.WaterLog.__table__
+    sleep = models.SleepLog.__table__
+    weight = models.WeightLog.__table__
+
+    return [
+        ("users", select(users).where(users.c.id == user_id)),
+        (
+            "journal_entries",
+            select(journal).where(journal.c.user_id == user_id).order_by(journal.c.id),
+        ),
+        (
+            "habit_definitions",
+            select(habits).where(habits.c.user_id == user_id).order_by(habits.c.id),
+        ),
+        (
+            "habit_completions",
+            select(completions)
+            .join(habits, completions.c.habit_id == habits.c.id)
+            .where(habits.c.user_id == user_id)
+            .order_by(completions.c.id),
+        ),
+        (
+            "activity_logs",
+            select(activities)
+            .where(activities.c.owner_id == user_id)
+            .order_by(activities.c.id),
+        ),
+        (
+            "nutrition_logs",
+            select(nutrition)
+            .where(nutrition.c.user_id == user_id)
+            .order_by(nutrition.c.id),
+        ),
+        (
+            "food_items",
+            select(food_items)
+            .join(nutrition, food_items.c.nutrition_log_id == nutrition.c.id)
+            .where(nutrition.c.user_id == user_id)
+            .order_by(food_items.c.id),
+        ),
+        (
+            "water_logs",
+            select(water).where(water.c.user_id == user_id).order_by(water.c.id),
+        ),
+        (
+            "sleep_logs",
+            select(sleep).where(sleep.c.user_id == user_id).order_by(sleep.c.id),
+        ),
+        (
+            "weight_logs",
+            select(weight).where(weight.c.user_id == user_id).order_by(weight.c.id),
+        ),
+    ]
+
+
+def iter_user_rows(user_id: int):
+    """Yields ``(table, columns, rows)`` batches of every row the user owns."""
+    with database.engine.connect() as connection:
+        for table, query in _user_queries(user_id):
+            result = connection.execute(query.execution_options(yield_per=YIELD_PER))
+            columns = list(result.keys())
+            for rows in result.partitions():
+                yield table, columns, rows
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_lines(user_id: int):
+    for table, columns, rows in iter_user_rows(user_id):
+        for row in rows:
+            yield json.dumps(
+                {"table": table, "data": dict(zip(columns, row))},
+                default=_json_default,
+                ensure_ascii=False,
+            ) + "\n"
+
+
+def _csv_lines(user_id: int):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    current_table = None
+    for table, columns, rows in iter_user_rows(user_id):
+        if table != current_table:
+            if current_table is not None:
+                writer.writerow([])
+            writer.writerow(["table", *columns])
+            current_table = table
+        for row in rows:
+            writer.writerow([table, *(_csv_value(value) for value in row)])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def stream_export(user_id: int, export_format: str, compress: bool):
+    """Encodes the user's data as NDJSON or CSV in ~64 KB chunks, optionally gzipped."""
+    lines = _csv_lines(user_id) if export_format == "csv" else _ndjson_lines(user_id)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    pending, size = [], 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            chunk = "".join(pending).encode()
+            pending, size = [], 0
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = "".join(pending).encode()
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
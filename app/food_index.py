@@ -0,0 +1,286 @@
+"""Local food index: nutrient lookup for known foods without calling the LLM.
+
+Entries come from the ``food_references`` table, filled from
+``app/data/food_reference.csv`` (approximate TACO values per portion) with
+
+    python -m app.food_index seed
+
+and from every ``FoodItem`` users have logged, averaged per normalized name.
+Names are matched by trigram similarity, the same measure as pg_trgm's
+``similarity()``. The index lives in memory per process, is built on first use
+and rebuilt in a background thread every FOOD_INDEX_REFRESH_SECONDS, serving the
+previous snapshot meanwhile; new logs are added in place.
+"""
+
+import argparse
+import csv
+import os
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import func, insert, update
+
+from app import database, models
+
+REFERENCE_CSV = Path(__file__).parent / "data" / "food_reference.csv"
+FOOD_INDEX_REFRESH_SECONDS = float(os.getenv("FOOD_INDEX_REFRESH_SECONDS", "3600"))
+NUTRIENTS = ("calories", "protein", "carbs", "fat")
+# pg_trgm's default similarity threshold.
+MIN_SIMILARITY = 0.3
+# Model output is only renamed to an indexed food above this similarity.
+CANONICAL_SIMILARITY = 0.6
+
+REFERENCE = "referencia"
+HISTORY = "historico"
+
+
+def normalize(name: str) -> str:
+    """Lowercase, accents removed, punctuation collapsed to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join("".join(c if c.isalnum() else " " for c in stripped).split())
+
+
+def trigrams(text: str) -> frozenset[str]:
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+@dataclass
+class FoodEntry:
+    name: str
+    source: str
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
+    portion: str | None = None
+    samples: int = 1
+    grams: frozenset[str] = field(default=frozenset(), repr=False)
+
+
+class _Snapshot:
+    def __init__(self):
+        self.entries: list[FoodEntry] = []
+        self.by_key: dict[str, int] = {}
+        self.postings: dict[str, list[int]] = defaultdict(list)
+
+    def add(self, key: str, entry: FoodEntry):
+        entry.grams = trigrams(key)
+        self.by_key[key] = len(self.entries)
+        for gram in entry.grams:
+            self.postings[gram].append(len(self.entries))
+        self.entries.append(entry)
+
+    def merge_history(self, key: str, name: str, samples: int, values: dict):
+        """Folds ``samples`` logged portions into the running mean for ``key``."""
+        index = self.by_key.get(key)
+        if index is None:
+            self.add(
+                key, FoodEntry(name=name, source=HISTORY, samples=samples, **values)
+            )
+            return
+
+        entry = self.entries[index]
+        if entry.source == REFERENCE:
+            return
+        total = entry.samples + samples
+        for nutrient in NUTRIENTS:
+            mean = getattr(entry, nutrient)
+            setattr(entry, nutrient, mean + (values[nutrient] - mean) * samples / total)
+        entry.samples = total
+
+
+class FoodIndex:
+    def __init__(self, refresh_seconds: float = FOOD_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: _Snapshot | None = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        # Held by whichever thread is rebuilding, so only one rebuild runs.
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self):
+        with database.SessionLocal() as db:
+            references = db.query(
+                models.FoodReference.name,
+                models.FoodReference.portion,
+                *(getattr(models.FoodReference, n) for n in NUTRIENTS),
+            ).all()
+            # Most frequent spellings first, so they name the merged entry.
+            history = (
+                db.query(
+                    models.FoodItem.food_name,
+                    func.count(models.FoodItem.id),
+                    *(func.avg(getattr(models.FoodItem, n)) for n in NUTRIENTS),
+                )
+                .group_by(models.FoodItem.food_name)
+                .order_by(func.count(models.FoodItem.id).desc())
+                .all()
+            )
+
+        snapshot = _Snapshot()
+        for name, portion, *values in references:
+            key = normalize(name)
+            if key and key not in snapshot.by_key:
+                entry = FoodEntry(name, REFERENCE, *values, portion=portion, samples=0)
+                snapshot.add(key, entry)
+        for name, samples, *values in history:
+            key = normalize(name)
+            if key:
+                snapshot.merge_history(
+                    key, name.strip(), samples, dict(zip(NUTRIENTS, values))
+                )
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._built_at = time.monotonic()
+
+    def reset(self):
+        """Drops the snapshot; the next search rebuilds it from the database."""
+        with self._refresh_lock, self._lock:
+            self._snapshot = None
+            self._built_at = 0.0
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Erro ao atualizar o índice de alimentos: {e}")
+            # Keep serving the old snapshot and retry after another interval.
+            self._built_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def _current(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    self.refresh()
+            return self._snapshot
+
+        if time.monotonic() - self._built_at > self.refresh_seconds:
+            if self._refresh_lock.acquire(blocking=False):
+                threading.Thread(
+                    target=self._refresh_in_background,
+                    name="food-index-refresh",
+                    daemon=True,
+                ).start()
+        return snapshot
+
+    def add_items(self, items):
+        """Adds freshly logged food items without waiting for the next rebuild."""
+        with self._lock:
+            if self._snapshot is None:
+                return
+            for item in items:
+                key = normalize(item.food_name)
+                if key:
+                    self._snapshot.merge_history(
+                        key,
+                        item.food_name.strip(),
+                        1,
+                        {n: getattr(item, n) for n in NUTRIENTS},
+                    )
+
+    def search(self, text: str, limit: int = 5) -> list[tuple[FoodEntry, float]]:
+        query = trigrams(normalize(text))
+        if not query:
+            return []
+
+        snapshot = self._current()
+        with self._lock:
+            shared = Counter()
+            for gram in query:
+                shared.update(snapshot.postings.get(gram, ()))
+            scored = []
+            for index, count in shared.items():
+                entry = snapshot.entries[index]
+                similarity = count / (len(query) + len(entry.grams) - count)
+                if similarity >= MIN_SIMILARITY:
+                    scored.append((entry, similarity))
+
+        scored.sort(
+            key=lambda match: (
+                -match[1],
+                match[0].source != REFERENCE,
+                -match[0].samples,
+            )
+        )
+        return scored[:limit]
+
+    def normalize_analysis(self, analysis: dict) -> dict:
+        """Renames model-detected foods to their indexed names, fills missing
+        nutrients from the index and recomputes the total."""
+        foods = []
+        for food in analysis.get("foods") or []:
+            matches = self.search(food.get("food_name") or "", limit=1)
+            if matches and matches[0][1] >= CANONICAL_SIMILARITY:
+                entry = matches[0][0]
+                food = {
+                    **food,
+                    "food_name": entry.name,
+                    **{
+                        n: round(getattr(entry, n), 1)
+                        for n in NUTRIENTS
+                        if food.get(n) is None
+                    },
+                }
+            foods.append(food)
+
+        total = sum(food.get("calories") or 0 for food in foods)
+        return {**analysis, "foods": foods, "total_calories": round(total, 1)}
+
+
+index = FoodIndex()
+
+
+def seed_references(db, path: Path | str = REFERENCE_CSV) -> int:
+    """Inserts or updates the reference foods listed in ``path``."""
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = [
+            {
+                "name": row["name"].strip(),
+                "portion": row["portion"].strip() or None,
+                **{n: float(row[n]) for n in NUTRIENTS},
+            }
+            for row in csv.DictReader(f)
+        ]
+
+    existing = dict(db.query(models.FoodReference.name, models.FoodReference.id).all())
+    updates = [
+        {**row, "id": existing[row["name"]]} for row in rows if row["name"] in existing
+    ]
+    inserts = [row for row in rows if row["name"] not in existing]
+    if updates:
+        db.execute(update(models.FoodReference), updates)
+    if inserts:
+        db.execute(insert(models.FoodReference), inserts)
+    db.commit()
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.food_index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed = commands.add_parser(
+        "seed", help="Carrega a tabela de alimentos de referência a partir de um CSV"
+    )
+    seed.add_argument("--csv", default=REFERENCE_CSV)
+    args = parser.parse_args(argv)
+
+    with database.SessionLocal() as db:
+        count = seed_references(db, args.csv)
+    print(f"{count} alimento(s) de referência carregado(s).")
+
+
+if __name__ == "__main__":
+    main()
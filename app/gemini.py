@@ -0,0 +1,55 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from app import metrics
+
+# google.genai takes a long time to import and only the AI routes need it, so it
+# is loaded on first use instead of at startup.
+
+# Swapped out by the benchmark suite for a local stub with configurable latency.
+client_factory = None
+
+_in_flight = 0
+_in_flight_changed = threading.Condition()
+
+
+def get_client():
+    if client_factory is not None:
+        return client_factory()
+
+    from google import genai
+
+    return genai.Client()
+
+
+def types():
+    from google.genai import types as genai_types
+
+    return genai_types
+
+
+@contextmanager
+def call(operation: str):
+    """Wraps a Gemini call: records metrics and lets shutdown wait for it."""
+    global _in_flight
+    with _in_flight_changed:
+        _in_flight += 1
+    try:
+        with metrics.track_gemini(operation):
+            yield
+    finally:
+        with _in_flight_changed:
+            _in_flight -= 1
+            _in_flight_changed.notify_all()
+
+
+def wait_until_idle(timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    with _in_flight_changed:
+        while _in_flight > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _in_flight_changed.wait(remaining)
+    return True
@@ -0,0 +1,365 @@
+"""Idempotency-Key support for write requests.
+
+The first request with a given key claims it in ``idempotency_records``; its
+response (status, headers and body) is stored there and replayed for every
+retry with the same key until the record expires. Completed records are also
+kept in a per-process LRU so most retries never reach the database.
+
+A key reused for a different request (including one asking for another
+response format) answers 422, and a retry that arrives while the first request
+is still running answers 409. Failed requests (5xx, an exception, or a
+transient refusal such as 429) release the key so the client can retry. A claim
+is a lease of IDEMPOTENCY_LOCK_SECONDS: if the process handling it dies, a retry
+after the lease runs out takes it over.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import anyio
+from sqlalchemy import delete, or_
+from sqlalchemy.exc import IntegrityError
+from starlette.datastructures import Headers
+
+from app import database, encoding, models
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+# Longer than any request should run, including the AI routes' queueing.
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+PURGE_INTERVAL_SECONDS = 300
+MAX_KEY_LENGTH = 255
+METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# "Not now" answers rather than outcomes; storing them would replay the refusal
+# until the key expires.
+TRANSIENT_STATUSES = {408, 409, 425, 429}
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status_code: int | None
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    route: str | None = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status_code is not None
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _aware(moment: datetime.datetime) -> datetime.datetime:
+    # SQLite hands timestamps back without their time zone.
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=datetime.timezone.utc)
+    return moment
+
+
+def _from_record(record: models.IdempotencyRecord) -> StoredResponse:
+    headers = json.loads(record.headers) if record.headers else []
+    return StoredResponse(
+        fingerprint=record.fingerprint,
+        status_code=record.status_code,
+        headers=[
+            (name.encode("latin-1"), value.encode("latin-1")) for name, value in headers
+        ],
+        body=record.body or b"",
+        route=record.route,
+    )
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        ttl: float = IDEMPOTENCY_TTL_SECONDS,
+        cache_size: int = IDEMPOTENCY_CACHE_SIZE,
+        lock_seconds: float = IDEMPOTENCY_LOCK_SECONDS,
+    ):
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.lock_seconds = lock_seconds
+        self._cache: OrderedDict[str, tuple[float, StoredResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _cached(self, key: str) -> StoredResponse | None:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return response
+
+    def _remember(self, key: str, response: StoredResponse, expires_in: float):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + expires_in, response)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def claim(self, key: str, fingerprint: str) -> StoredResponse | None:
+        """Claims ``key`` for a new request, or returns what is already stored."""
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        now = _utcnow()
+        with database.SessionLocal() as db:
+            if time.monotonic() - self._last_purge > PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.monotonic()
+                db.execute(
+                    delete(models.IdempotencyRecord).where(
+                        models.IdempotencyRecord.expires_at < now
+                    )
+                )
+
+            record = db.get(models.IdempotencyRecord, key)
+            if record is not None and _aware(record.expires_at) < now:
+                db.delete(record)
+                db.flush()
+                record = None
+            locked_until = now + datetime.timedelta(seconds=self.lock_seconds)
+            if (
+                record is not None
+                and record.status_code is None
+                and record.fingerprint == fingerprint
+                and (record.locked_until is None or _aware(record.locked_until) < now)
+            ):
+                # The request holding the key died without completing or
+                # releasing it; take the lease over unless another retry has.
+                taken = (
+                    db.query(models.IdempotencyRecord)
+                    .filter(
+                        models.IdempotencyRecord.key == key,
+                        models.IdempotencyRecord.status_code.is_(None),
+                        or_(
+                            models.IdempotencyRecord.locked_until.is_(None),
+                            models.IdempotencyRecord.locked_until < now,
+                        ),
+                    )
+                    .update({"locked_until": locked_until}, synchronize_session=False)
+                )
+                db.commit()
+                if taken:
+                    return None
+                record = db.get(models.IdempotencyRecord, key)
+            if record is not None:
+                db.commit()
+                return self._loaded(key, record, now)
+
+            db.add(
+                models.IdempotencyRecord(
+                    key=key,
+                    fingerprint=fingerprint,
+                    locked_until=locked_until,
+                    expires_at=now + datetime.timedelta(seconds=self.ttl),
+                )
+            )
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker claimed the key first.
+                db.rollback()
+                record = db.get(models.IdempotencyRecord, key)
+                return self._loaded(key, record, now) if record else None
+            return None
+
+    def _loaded(self, key, record, now) -> StoredResponse:
+        response = _from_record(record)
+        if response.completed:
+            expires_in = (_aware(record.expires_at) - now).total_seconds()
+            self._remember(key, response, expires_in)
+        return response
+
+    def complete(
+        self,
+        key: str,
+        fingerprint: str,
+        status_code: int,
+        headers,
+        body,
+        route: str | None = None,
+    ):
+        stored_headers = [
+            (name.decode("latin-1"), value.decode("latin-1")) for name, value in headers
+        ]
+        with database.SessionLocal() as db:
+            db.query(models.IdempotencyRecord).filter(
+                models.IdempotencyRecord.key == key
+            ).update(
+                {
+                    "status_code": status_code,
+                    "headers": json.dumps(stored_headers),
+                    "body": body,
+                    "locked_until": None,
+                    "route": route,
+                }
+            )
+            db.commit()
+        self._remember(
+            key,
+            StoredResponse(fingerprint, status_code, list(headers), body, route),
+            self.ttl,
+        )
+
+    def release(self, key: str):
+        with database.SessionLocal() as db:
+            db.execute(
+                delete(models.IdempotencyRecord).where(
+                    models.IdempotencyRecord.key == key,
+                    models.IdempotencyRecord.status_code.is_(None),
+                )
+            )
+            db.commit()
+
+
+store = IdempotencyStore()
+
+
+def _fingerprint(scope, body: bytes) -> str:
+    # The stored body is already rendered, so the format it was negotiated in is
+    # part of the request.
+    msgpack = encoding.prefers_msgpack(Headers(scope=scope).get("accept", ""))
+    digest = hashlib.sha256()
+    digest.update(scope["method"].encode())
+    digest.update(b"\0" + scope["path"].encode())
+    digest.update(b"\0" + scope.get("query_string", b""))
+    digest.update(b"\0" + (b"msgpack" if msgpack else b"json"))
+    digest.update(b"\0" + body)
+    return digest.hexdigest()
+
+
+async def _send_json(send, status_code: int, detail: str):
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response for write requests with a known Idempotency-Key."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        key = dict(scope["headers"]).get(b"idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        key = key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _send_json(
+                send,
+                400,
+                f"Idempotency-Key deve ter entre 1 e {MAX_KEY_LENGTH} caracteres.",
+            )
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+        fingerprint = _fingerprint(scope, body)
+
+        stored = await anyio.to_thread.run_sync(store.claim, key, fingerprint)
+        if stored is not None:
+            if stored.route:
+                # Replays never reach the router; label them with the original
+                # route in the metrics.
+                scope["route_template"] = stored.route
+            if stored.fingerprint != fingerprint:
+                await _send_json(
+                    send,
+                    422,
+                    "Esta Idempotency-Key já foi usada em outra requisição.",
+                )
+            elif not stored.completed:
+                await _send_json(
+                    send,
+                    409,
+                    "Uma requisição com esta Idempotency-Key ainda está em andamento.",
+                )
+            else:
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": stored.status_code,
+                        "headers": stored.headers + [(b"idempotent-replayed", b"true")],
+                    }
+                )
+                await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        headers = []
+        response_body = []
+
+        async def capture_send(message):
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(store.release, key)
+            raise
+
+        if status_code >= 500 or status_code in TRANSIENT_STATUSES:
+            await anyio.to_thread.run_sync(store.release, key)
+        else:
+            await anyio.to_thread.run_sync(
+                store.complete,
+                key,
+                fingerprint,
+                status_code,
+                headers,
+                b"".join(response_body),
+                getattr(scope.get("route"), "path", None),
+            )
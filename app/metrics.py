@@ -0,0 +1,196 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+
+REQUEST_LATENCY = Histogram(
+    "harmonia_http_request_duration_seconds",
+    "Latência das requisições HTTP por rota.",
+    ["method", "route"],
+)
+REQUESTS_TOTAL = Counter(
+    "harmonia_http_requests_total",
+    "Requisições HTTP por rota e status.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "harmonia_http_requests_in_flight",
+    "Requisições HTTP em andamento.",
+    multiprocess_mode="livesum",
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "harmonia_db_queries_per_request",
+    "Número de queries SQL executadas por requisição.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "harmonia_db_time_per_request_seconds",
+    "Tempo total gasto em SQL por requisição.",
+    ["route"],
+)
+
+GEMINI_LATENCY = Histogram(
+    "harmonia_gemini_request_duration_seconds",
+    "Latência das chamadas ao Gemini.",
+    ["operation"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+GEMINI_ERRORS = Counter(
+    "harmonia_gemini_errors_total",
+    "Chamadas ao Gemini que falharam.",
+    ["operation"],
+)
+GEMINI_IN_FLIGHT = Gauge(
+    "harmonia_gemini_requests_in_flight",
+    "Chamadas ao Gemini em andamento.",
+    multiprocess_mode="livesum",
+)
+
+
+AI_REJECTIONS = Counter(
+    "harmonia_ai_rejections_total",
+    "Requisições às rotas de IA recusadas pelo controle de admissão.",
+    ["route", "reason"],
+)
+AI_QUEUE_WAIT = Histogram(
+    "harmonia_ai_queue_wait_seconds",
+    "Tempo de espera por uma vaga no bulkhead das rotas de IA.",
+    ["route"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
+
+@dataclass
+class SQLStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+_sql_stats: ContextVar[SQLStats | None] = ContextVar("sql_stats", default=None)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = _sql_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+
+@contextmanager
+def track_gemini(operation: str):
+    GEMINI_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        GEMINI_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        GEMINI_LATENCY.labels(operation).observe(time.perf_counter() - start)
+        GEMINI_IN_FLIGHT.dec()
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        # Set by app.idempotency for replayed responses, which skip routing.
+        return scope.get("route_template", "<unmatched>")
+    return getattr(route, "path", "<unmatched>")
+
+
+class PrometheusMiddleware:
+    """Records latency, status and SQL usage for every HTTP request.
+
+    In debug mode the per-request SQL totals are also returned in the
+    ``X-DB-Query-Count`` and ``X-DB-Query-Time-Ms`` response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = SQLStats()
+        token = _sql_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if DEBUG:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(stats.queries).encode()),
+                        (b"x-db-query-time-ms", f"{stats.seconds * 1000:.2f}".encode()),
+                    ]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            _sql_stats.reset(token)
+            route = _route_template(scope)
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            REQUESTS_TOTAL.labels(method, route, str(status_code)).inc()
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.seconds)
+
+
+def _multiprocess() -> bool:
+    # Set by app.server when running several workers, so each one writes its
+    # samples to a shared directory and /metrics aggregates all of them.
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def render_latest() -> tuple[bytes, str]:
+    if _multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    if _multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
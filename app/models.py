@@ -14,6 +14,9 @@ from sqlalchemy import (
     UniqueConstraint,
     DateTime,
     Text,
+    LargeBinary,
+    DDL,
+    event,
 )
 from sqlalchemy.orm import relationship
 
@@ -34,9 +37,11 @@ class User(Base):
 
     main_goal = Column(String(50), nullable=True)
     activity_level = Column(String(20), nullable=True)
-    signup_date = Column(Date, default=func.now())
+    signup_date = Column(Date, default=func.current_date())
     plan_type = Column(String(20), nullable=False, default="Gratuito")
     has_apple_watch = Column(Boolean, default=False)
+    # Bumped by every write that feeds the cached analytics (app/analytics/cache.py).
+    analytics_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     habit_definitions = relationship(
         "HabitDefinition", back_populates="owner", cascade="all, delete-orphan"
@@ -88,6 +93,29 @@ class JournalEntry(Base):
     owner = relationship("User")
 
 
+# Full-text search over journal content (Postgres only, see app/search.py).
+# Existing databases get the same column and index from
+# migrations/journal_search.sql.
+JOURNAL_SEARCH_CONFIG = "portuguese"
+event.listen(
+    JournalEntry.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE journal_entries ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{JOURNAL_SEARCH_CONFIG}', "
+        "coalesce(content, ''))) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    JournalEntry.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_journal_entries_search_vector "
+        "ON journal_entries USING GIN (search_vector)"
+    ).execute_if(dialect="postgresql"),
+)
+
+
 class ActivityTypeEnum(str, enum.Enum):
     running = "Corrida"
     walking = "Caminhada"
@@ -147,6 +175,18 @@ class FoodItem(Base):
     log = relationship("NutritionLog", back_populates="items")
 
 
+class FoodReference(Base):
+    __tablename__ = "food_references"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(120), nullable=False, unique=True)
+    portion = Column(String(60), nullable=True)
+    calories = Column(Float, nullable=False)
+    protein = Column(Float, nullable=False)
+    carbs = Column(Float, nullable=False)
+    fat = Column(Float, nullable=False)
+
+
 class WaterLog(Base):
     __tablename__ = "water_logs"
 
@@ -185,3 +225,20 @@ class WeightLog(Base):
     user_id = Column(Integer, nullable=False)
     weight_kg = Column(Float, nullable=False)
     log_date = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_records"
+
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # NULL while the first request is still being processed.
+    status_code = Column(Integer, nullable=True)
+    headers = Column(Text, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    # Route template of the original request, for labelling replays.
+    route = Column(String(255), nullable=True)
+    # Lease on an unfinished request; a retry may take the key over after it.
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.analytics import cache as analytics_cache
+from app.dependencies import get_db
+
+router = APIRouter(tags=["activities"])
+
+
+@router.post("/activities/", response_model=schemas.Activity)
+def create_activity(activity: schemas.ActivityCreate, db: Session = Depends(get_db)):
+    activity_data = activity.model_dump()
+    activity_data["activity_type"] = activity.activity_type.value
+    db_activity = models.ActivityLog(**activity_data)
+    db.add(db_activity)
+    analytics_cache.bump_version(db, db_activity.owner_id)
+    db.commit()
+    db.refresh(db_activity)
+    return db_activity
+
+
+@router.get("/users/{user_id}/activities/", response_model=list[schemas.Activity])
+def read_user_activities(user_id: int, db: Session = Depends(get_db)):
+    activities = (
+        db.query(models.ActivityLog)
+        .filter(models.ActivityLog.owner_id == user_id)
+        .order_by(models.ActivityLog.date.desc())
+        .all()
+    )
+    if not activities:
+        return []
+    return activities
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from app import admission, schemas, gemini
+
+router = APIRouter(tags=["coach"])
+
+
+@router.post("/coach/ask")
+async def ask_coach(request: schemas.CoachRequest, http_request: Request):
+    admission.check_rate_limit(http_request, request.user_id)
+    return await admission.coach.run(_ask_coach, request)
+
+
+def _ask_coach(request: schemas.CoachRequest):
+    system_prompt = [
+        "Você é o 'Harmonia', um coach de saúde e bem-estar amigável e motivacional. ",
+        "Seu objetivo é fornecer conselhos práticos, seguros e positivos baseados em princípios de saúde. ",
+        "Nunca dê conselhos médicos diretos ou diagnósticos. Sempre incentive o usuário a consultar um profissional de saúde para questões sérias. ",
+        "Responda de forma concisa e encorajadora.",
+    ]
+
+    conversation_history = []
+    for message in request.history:
+        role = "user" if message.role == "user" else "model"
+        conversation_history.append(
+            {"role": role, "parts": [{"text": message.content}]}
+        )
+
+    client = gemini.get_client()
+
+    try:
+        with gemini.call("coach"):
+            chat = client.chats.create(
+                model="gemini-2.5-flash",
+                config=gemini.types().GenerateContentConfig(
+                    system_instruction=system_prompt
+                ),
+                history=conversation_history,
+            )
+            response = chat.send_message(
+                message=request.current_message,
+            )
+        return {"answer": response.text}
+    except Exception as e:
+        print(f"erro: {e}")
+        raise HTTPException(
+            status_code=500, detail="Ocorreu um erro ao processar sua pergunta."
+        )
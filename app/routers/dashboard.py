@@ -0,0 +1,57 @@
+import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.dependencies import get_db
+
+router = APIRouter(tags=["dashboard"])
+
+
+@router.get("/dashboard/user/{user_id}", response_model=schemas.DashboardDataResponse)
+def get_dashboard_data(user_id: int, date_str: str, db: Session = Depends(get_db)):
+    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+    try:
+        target_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Formato de data inválido. Use AAAA-MM-DD."
+        )
+    habit_definitions = (
+        db.query(models.HabitDefinition)
+        .filter(models.HabitDefinition.user_id == user_id)
+        .all()
+    )
+
+    completed_today_ids = {
+        c.habit_id
+        for c in db.query(models.HabitCompletion)
+        .filter(
+            models.HabitCompletion.date == target_date,
+            models.HabitCompletion.definition.has(user_id=user_id),
+        )
+        .all()
+    }
+
+    habits_status = [
+        schemas.HabitStatus(
+            id=definition.id,
+            user_id=definition.user_id,
+            name=definition.name,
+            icon=definition.icon,
+            is_completed=(definition.id in completed_today_ids),
+        )
+        for definition in habit_definitions
+    ]
+
+    return schemas.DashboardDataResponse(
+        user_name=db_user.name.split(" ")[0],
+        activity=schemas.ActivityData(steps=7890),
+        sleep=schemas.SleepData(duration="5h42min"),
+        daily_insight="Continue assim! A consistência é a chave para o sucesso.",
+        habits=habits_status,
+    )
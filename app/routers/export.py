@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import export, models, schemas
+from app.dependencies import get_db
+
+router = APIRouter(tags=["export"])
+
+MEDIA_TYPES = {
+    schemas.ExportFormat.ndjson: "application/x-ndjson",
+    schemas.ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+@router.get("/users/{user_id}/export")
+def export_user_data(
+    user_id: int,
+    export_format: schemas.ExportFormat = Query(
+        schemas.ExportFormat.ndjson, alias="format"
+    ),
+    gzip: bool = False,
+    db: Session = Depends(get_db),
+):
+    if not db.query(models.User.id).filter(models.User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    # The export streams on its own connection; release this one now instead of
+    # holding it until the whole stream has been sent.
+    db.close()
+
+    filename = f"harmonia-export-{user_id}.{export_format.value}"
+    media_type = MEDIA_TYPES[export_format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        export.stream_export(user_id, export_format.value, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,113 @@
+import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.analytics import cache as analytics_cache
+from app.dependencies import get_db
+
+router = APIRouter(tags=["habits"])
+
+
+@router.post("/habits/{habit_def_id}/toggle", response_model=schemas.HabitStatus)
+def toggle_habit_completion(
+    habit_def_id: int, date_str: str, db: Session = Depends(get_db)
+):
+    try:
+        target_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Formato de data inválido. Use AAAA-MM-DD."
+        )
+
+    habit_def = (
+        db.query(models.HabitDefinition)
+        .filter(models.HabitDefinition.id == habit_def_id)
+        .first()
+    )
+    if not habit_def:
+        raise HTTPException(
+            status_code=404, detail="Definição de hábito não encontrada"
+        )
+
+    completion = (
+        db.query(models.HabitCompletion)
+        .filter(
+            models.HabitCompletion.habit_id == habit_def_id,
+            models.HabitCompletion.date == target_date,
+        )
+        .first()
+    )
+
+    if completion:
+        db.delete(completion)
+        is_completed_now = False
+    else:
+        new_completion = models.HabitCompletion(habit_id=habit_def_id, date=target_date)
+        db.add(new_completion)
+        is_completed_now = True
+
+    habit_status = schemas.HabitStatus(
+        id=habit_def.id,
+        user_id=habit_def.user_id,
+        name=habit_def.name,
+        icon=habit_def.icon,
+        is_completed=is_completed_now,
+    )
+    analytics_cache.bump_version(db, habit_status.user_id)
+    db.commit()
+
+    return habit_status
+
+
+@router.get("/habits/{habit_def_id}/history", response_model=schemas.HabitHistory)
+def get_habit_history(habit_def_id: int, db: Session = Depends(get_db)):
+    completions_query = (
+        db.query(models.HabitCompletion)
+        .filter(models.HabitCompletion.habit_id == habit_def_id)
+        .order_by(models.HabitCompletion.date.desc())
+        .all()
+    )
+
+    completed_dates = {completion.date for completion in completions_query}
+
+    if not completed_dates:
+        return schemas.HabitHistory(current_streak=0, completed_dates=[])
+
+    current_streak = 0
+    today = datetime.date.today()
+    check_date = today
+
+    if check_date not in completed_dates:
+        check_date = today - datetime.timedelta(days=1)
+
+    while check_date in completed_dates:
+        current_streak += 1
+        check_date -= datetime.timedelta(days=1)
+
+    return schemas.HabitHistory(
+        current_streak=current_streak,
+        completed_dates=sorted(list(completed_dates), reverse=True),
+    )
+
+
+@router.post("/users/{user_id}/habits", response_model=schemas.HabitStatus)
+def create_habit_definition(
+    user_id: int, habit: schemas.HabitDefinitionCreate, db: Session = Depends(get_db)
+):
+    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+    db_habit_def = models.HabitDefinition(**habit.model_dump(), user_id=user_id)
+    db.add(db_habit_def)
+    db.commit()
+    db.refresh(db_habit_def)
+    return schemas.HabitStatus(
+        id=db_habit_def.id,
+        user_id=db_habit_def.user_id,
+        name=db_habit_def.name,
+        icon=db_habit_def.icon,
+        is_completed=False,
+    )
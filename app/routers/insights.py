@@ -0,0 +1,53 @@
+import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.analytics import cache as analytics_cache
+from app.analytics import correlations
+from app.dependencies import get_db
+
+router = APIRouter(tags=["insights"])
+
+DEFAULT_RANGE_DAYS = 90
+MAX_RANGE_DAYS = 730
+
+
+@router.get(
+    "/users/{user_id}/insights/correlations",
+    response_model=schemas.CorrelationInsights,
+)
+def read_correlation_insights(
+    user_id: int,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+    db: Session = Depends(get_db),
+):
+    end_date = end_date or datetime.date.today()
+    start_date = start_date or end_date - datetime.timedelta(
+        days=DEFAULT_RANGE_DAYS - 1
+    )
+    if start_date > end_date or (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Período inválido. Use no máximo {MAX_RANGE_DAYS} dias.",
+        )
+
+    key = (start_date, end_date)
+    version = analytics_cache.current_version(db, user_id)
+    insights = correlations.insights_cache.get(user_id, key, version)
+    if insights is None:
+        rows = db.execute(
+            correlations.daily_grid_query(user_id, start_date, end_date)
+        ).all()
+        insights = correlations.analyze(rows, start_date, end_date)
+        correlations.insights_cache.set(user_id, insights, key, version)
+
+    return {
+        "user_id": user_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        **insights,
+    }
@@ -0,0 +1,68 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app import models, schemas, search
+from app.analytics import cache as analytics_cache
+from app.dependencies import get_db
+
+router = APIRouter(tags=["journal"])
+
+
+@router.post("/users/{user_id}/journal", response_model=schemas.JournalEntry)
+def create_or_update_journal_entry(
+    user_id: int, entry: schemas.JournalEntryCreate, db: Session = Depends(get_db)
+):
+    db_entry = (
+        db.query(models.JournalEntry)
+        .filter(
+            models.JournalEntry.user_id == user_id,
+            models.JournalEntry.date == entry.date,
+        )
+        .first()
+    )
+
+    if db_entry:
+        db_entry.mood = entry.mood.value
+        db_entry.content = entry.content
+    else:
+        db_entry = models.JournalEntry(
+            user_id=user_id,
+            date=entry.date,
+            mood=entry.mood.value,
+            content=entry.content,
+        )
+        db.add(db_entry)
+
+    analytics_cache.bump_version(db, user_id)
+    db.commit()
+    db.refresh(db_entry)
+    return db_entry
+
+
+@router.get("/journal_entries/{user_id}", response_model=list[schemas.JournalEntry])
+def get_journal_entries(user_id: int, db: Session = Depends(get_db)):
+    entries = (
+        db.query(models.JournalEntry)
+        .filter(models.JournalEntry.user_id == user_id)
+        .order_by(models.JournalEntry.date.desc())
+        .all()
+    )
+    if not entries:
+        return []
+    return entries
+
+
+@router.get("/users/{user_id}/journal/search", response_model=schemas.JournalSearchPage)
+def search_journal_entries(
+    user_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    mood: Optional[schemas.Mood] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    return search.search_journal(
+        db, user_id, q, mood.value if mood else None, cursor, limit
+    )
@@ -0,0 +1,135 @@
+import io
+import json
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import admission, food_index, models, schemas, gemini
+from app.dependencies import get_db
+
+router = APIRouter(tags=["nutrition"])
+
+
+@router.post(
+    "/nutrition/analyze-meal", response_model=schemas.NutritionAnalysisResponse
+)
+async def analyze_meal_image(http_request: Request, image: UploadFile = File(...)):
+    admission.check_rate_limit(http_request)
+    image_bytes = await image.read()
+    return await admission.analyze_meal.run(
+        _analyze_meal_image, image_bytes, image.filename
+    )
+
+
+def _analyze_meal_image(image_bytes: bytes, filename: str):
+    prompt = """
+    Analise a imagem de comida. Por favor, identifique cada item alimentar e estime a quantidade.
+    Para cada item, forneça uma estimativa de calorias, proteínas, carboidratos e gorduras.
+    Além disso, forneça um insight geral sobre a refeição (ex: "Refeição balanceada, rica em proteínas" 
+    ou "Pode ser alta em gorduras saturadas, considere uma porção menor na próxima vez.").
+
+    Retorne a resposta como um JSON válido no seguinte formato, sem nenhum texto antes ou depois:
+    {
+        "foods": [
+            {"food_name": "Nome do Alimento 1", "calories": 100, "protein": 10, "carbs": 15, "fat": 5},
+            {"food_name": "Nome do Alimento 2", "calories": 250, "protein": 5, "carbs": 30, "fat": 12}
+        ],
+        "insights": "Sua análise geral aqui...",
+        "total_calories": 350
+    }
+    """
+
+    try:
+        client = gemini.get_client()
+        in_memory_file = io.BytesIO(image_bytes)
+
+        temp_file_name = f"temp_{filename}"
+
+        with gemini.call("analyze_meal"):
+            uploaded_file = client.files.upload(
+                file=in_memory_file,
+                config=gemini.types().UploadFileConfig(
+                    display_name=temp_file_name, mime_type="image/jpeg"
+                ),
+            )
+
+            print(f"Arquivo enviado com sucesso: {uploaded_file.name}")
+
+            response = client.models.generate_content(
+                model="gemini-1.5-flash",
+                contents=[uploaded_file, prompt],
+                config=gemini.types().GenerateContentConfig(
+                    response_mime_type="application/json"
+                ),
+            )
+            client.files.delete(name=uploaded_file.name)
+            print(f"Arquivo temporário deletado: {uploaded_file.name}")
+
+            analysis_data = json.loads(response.text)
+
+    except Exception as e:
+        print(f"Erro detalhado ao chamar a API do Gemini: {e}")
+        raise HTTPException(
+            status_code=500, detail="Ocorreu um erro ao processar a imagem com a IA."
+        )
+
+    try:
+        return food_index.index.normalize_analysis(analysis_data)
+    except Exception as e:
+        # The index only refines the analysis; without it the model's values stand.
+        print(f"Erro ao normalizar a análise com o índice de alimentos: {e}")
+        return analysis_data
+
+
+@router.post("/nutrition", response_model=schemas.NutritionLog)
+def create_nutrition_log(
+    log_data: schemas.NutritionLogCreate, db: Session = Depends(get_db)
+):
+    db_log = models.NutritionLog(
+        user_id=log_data.user_id,
+        log_date=log_data.log_date,
+        total_calories=log_data.total_calories,
+        total_protein=log_data.total_protein,
+        total_carbs=log_data.total_carbs,
+        total_fat=log_data.total_fat,
+        insights=log_data.insights,
+    )
+    db.add(db_log)
+    db.flush()
+
+    if log_data.items:
+        db.execute(
+            insert(models.FoodItem),
+            [
+                {**item_data.model_dump(), "nutrition_log_id": db_log.id}
+                for item_data in log_data.items
+            ],
+        )
+
+    db.commit()
+    db.refresh(db_log)
+    food_index.index.add_items(log_data.items)
+    return db_log
+
+
+@router.get("/nutrition/lookup", response_model=List[schemas.FoodLookupResult])
+def lookup_food(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(5, ge=1, le=20),
+):
+    return [
+        {
+            "food_name": entry.name,
+            "portion": entry.portion,
+            "calories": round(entry.calories, 1),
+            "protein": round(entry.protein, 1),
+            "carbs": round(entry.carbs, 1),
+            "fat": round(entry.fat, 1),
+            "source": entry.source,
+            "samples": entry.samples,
+            "similarity": round(similarity, 3),
+        }
+        for entry, similarity in food_index.index.search(q, limit)
+    ]
@@ -0,0 +1,53 @@
+import json
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app import admission, gemini
+from app.schemas import HabitSuggestion, SuggestionRequest
+
+router = APIRouter(tags=["onboarding"])
+
+
+@router.post("/onboarding/suggest-habits", response_model=List[HabitSuggestion])
+async def suggest_habits(request: SuggestionRequest, http_request: Request):
+    admission.check_rate_limit(http_request)
+    return await admission.suggest_habits.run(_suggest_habits, request)
+
+
+def _suggest_habits(request: SuggestionRequest):
+    system_prompt = [
+        "Você é o 'Harmonia', um coach de saúde e bem-estar amigável e motivacional. ",
+        "Seu objetivo é fornecer conselhos práticos, seguros e positivos baseados em princípios de saúde. ",
+        "Nunca dê conselhos médicos diretos ou diagnósticos. Sempre incentive o usuário a consultar um profissional de saúde para questões sérias. ",
+        "Responda de forma concisa e encorajadora.",
+    ]
+
+    prompt = f"""
+    Sugira 3 hábitos simples e eficazes para alguém cujo principal objetivo de saúde é '{request.objective}'.
+    Para cada hábito, sugira também um ícone do 'SF Symbols' da Apple.
+    Retorne a resposta como um array JSON válido, sem nenhum texto antes nem depois, como no seguinte formato:
+    [
+        {{"name": "Nome do Hábito 1", "icon": "icone.do.sf.symbol"}},
+        {{"name": "Nome do Hábito 2", "icon": "outro.icone"}},
+        {{"name": "Nome do Hábito 3", "icon": "mais.um.icone"}}
+    ]
+    """
+    try:
+        client = gemini.get_client()
+        with gemini.call("suggest_habits"):
+            response = client.models.generate_content(
+                config=gemini.types().GenerateContentConfig(
+                    system_instruction=system_prompt,
+                    response_mime_type="application/json",
+                ),
+                model="gemini-2.5-flash",
+                contents=prompt,
+            )
+            suggested_habits = json.loads(response.text)
+        return suggested_habits
+    except Exception as e:
+        print(f"Erro ao sugerir hábitos: {e}")
+        raise HTTPException(
+            status_code=500, detail="Não foi possível gerar sugestões de hábitos."
+        )
@@ -0,0 +1,88 @@
+import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.analytics import cache as analytics_cache
+from app.analytics import sleep as sleep_analytics
+from app.dependencies import get_db
+
+router = APIRouter(tags=["sleep"])
+
+
+@router.post("/users/{user_id}/sleep", response_model=schemas.SleepLog)
+def create_sleep_log(
+    user_id: int, sleep_log: schemas.SleepLogCreate, db: Session = Depends(get_db)
+):
+    if sleep_log.end_time <= sleep_log.start_time:
+        raise HTTPException(
+            status_code=400,
+            detail="A hora de acordar deve ser depois da hora de dormir.",
+        )
+
+    duration_delta = sleep_log.end_time - sleep_log.start_time
+    duration_minutes = int(duration_delta.total_seconds() / 60)
+
+    sleep_data = sleep_log.model_dump()
+    if sleep_log.quality:
+        sleep_data["quality"] = sleep_log.quality.value
+
+    db_sleep_log = models.SleepLog(
+        **sleep_data, user_id=user_id, duration_minutes=duration_minutes
+    )
+
+    db.add(db_sleep_log)
+    analytics_cache.bump_version(db, user_id)
+    db.commit()
+    db.refresh(db_sleep_log)
+    return db_sleep_log
+
+
+@router.get("/users/{user_id}/sleep", response_model=List[schemas.SleepLog])
+def read_sleep_logs(user_id: int, limit: int = 30, db: Session = Depends(get_db)):
+    return (
+        db.query(models.SleepLog)
+        .filter(models.SleepLog.user_id == user_id)
+        .order_by(models.SleepLog.start_time.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get("/users/{user_id}/sleep/analytics", response_model=schemas.SleepAnalytics)
+def read_sleep_analytics(
+    user_id: int,
+    days: int = Query(30, ge=1, le=365),
+    target_minutes: int = Query(sleep_analytics.DEFAULT_TARGET_MINUTES, ge=60, le=900),
+    utc_offset_minutes: int = Query(0, ge=-720, le=840),
+    db: Session = Depends(get_db),
+):
+    key = (days, target_minutes, utc_offset_minutes)
+    version = analytics_cache.current_version(db, user_id)
+    analytics = sleep_analytics.analytics_cache.get(user_id, key, version)
+    if analytics is None:
+        since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            days=days
+        )
+        rows = (
+            db.query(
+                models.SleepLog.start_time,
+                models.SleepLog.end_time,
+                models.SleepLog.duration_minutes,
+                models.SleepLog.quality,
+            )
+            .filter(models.SleepLog.user_id == user_id)
+            .filter(models.SleepLog.end_time >= since)
+            .all()
+        )
+        analytics = sleep_analytics.analyze(rows, target_minutes, utc_offset_minutes)
+        sleep_analytics.analytics_cache.set(user_id, analytics, key, version)
+
+    return {
+        "user_id": user_id,
+        "days": days,
+        "target_minutes": target_minutes,
+        **analytics,
+    }
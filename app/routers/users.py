@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.dependencies import get_db
+
+router = APIRouter(tags=["users"])
+
+
+@router.post("/users/login", response_model=schemas.User)
+def find_or_create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+
+    if db_user:
+        return db_user
+
+    new_user = models.User(name=user.name, email=user.email)
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+
+@router.get("/users/{user_id}", response_model=schemas.User)
+def get_user_details(user_id: int, db: Session = Depends(get_db)):
+    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    return db_user
+
+
+@router.patch("/users/{user_id}", response_model=schemas.User)
+def update_user_goal(
+    user_id: int, user_update: schemas.UserUpdate, db: Session = Depends(get_db)
+):
+    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+    db_user.main_goal = user_update.main_goal
+    db.commit()
+    db.refresh(db_user)
+    return db_user
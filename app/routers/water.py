@@ -0,0 +1,56 @@
+import datetime
+from datetime import date, time
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.dependencies import get_db
+
+router = APIRouter(tags=["water"])
+
+
+@router.post("/users/{user_id}/water", response_model=schemas.WaterLog)
+def create_water_log_for_user(
+    user_id: int, water_log: schemas.WaterLogCreate, db: Session = Depends(get_db)
+):
+    db_water_log = models.WaterLog(**water_log.dict(), user_id=user_id)
+    db.add(db_water_log)
+    db.commit()
+    db.refresh(db_water_log)
+    response_log = schemas.WaterLog.from_orm(db_water_log)
+    return response_log
+
+
+@router.get("/users/{user_id}/water", response_model=List[schemas.WaterLog])
+def read_water_logs_for_user(
+    user_id: int, log_date: date = None, db: Session = Depends(get_db)
+):
+    if log_date is None:
+        log_date = date.today()
+
+    start_of_day = datetime.datetime.combine(log_date, time.min)
+    end_of_day = datetime.datetime.combine(log_date, time.max)
+
+    return (
+        db.query(models.WaterLog)
+        .filter(
+            models.WaterLog.user_id == user_id,
+            models.WaterLog.log_date >= start_of_day,
+            models.WaterLog.log_date <= end_of_day,
+        )
+        .order_by(models.WaterLog.log_date.desc())
+        .all()
+    )
+
+
+@router.delete("/water/{log_id}", status_code=204)
+def delete_water_log(log_id: int, db: Session = Depends(get_db)):
+    db_log = db.query(models.WaterLog).filter(models.WaterLog.id == log_id).first()
+    if db_log is None:
+        raise HTTPException(status_code=404, detail="Registro de água não encontrado")
+
+    db.delete(db_log)
+    db.commit()
+    return {"ok": True}
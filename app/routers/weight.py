@@ -0,0 +1,61 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.analytics import cache as analytics_cache
+from app.analytics import weight as weight_analytics
+from app.dependencies import get_db
+
+router = APIRouter(tags=["weight"])
+
+
+@router.post("/users/{user_id}/weight", response_model=schemas.WeightLog)
+def create_weight_log(
+    user_id: int, weight_log: schemas.WeightLogCreate, db: Session = Depends(get_db)
+):
+    db_weight_log = models.WeightLog(**weight_log.model_dump(), user_id=user_id)
+    db.add(db_weight_log)
+    analytics_cache.bump_version(db, user_id)
+    db.commit()
+    db.refresh(db_weight_log)
+    return db_weight_log
+
+
+@router.get("/users/{user_id}/weight", response_model=List[schemas.WeightLog])
+def read_weight_logs(user_id: int, db: Session = Depends(get_db)):
+    return (
+        db.query(models.WeightLog)
+        .filter(models.WeightLog.user_id == user_id)
+        .order_by(models.WeightLog.log_date.desc())
+        .all()
+    )
+
+
+@router.get("/users/{user_id}/weight/trend", response_model=schemas.WeightTrend)
+def read_weight_trend(
+    user_id: int,
+    target_weight_kg: Optional[float] = None,
+    db: Session = Depends(get_db),
+):
+    version = analytics_cache.current_version(db, user_id)
+    analysis = weight_analytics.trend_cache.get(user_id, version=version)
+    if analysis is None:
+        rows = (
+            db.query(models.WeightLog.log_date, models.WeightLog.weight_kg)
+            .filter(models.WeightLog.user_id == user_id)
+            .all()
+        )
+        analysis = weight_analytics.analyze_rows(rows)
+        weight_analytics.trend_cache.set(user_id, analysis, version=version)
+
+    slope = analysis["slope"]
+    current = analysis["current_trend_kg"]
+    return {
+        "user_id": user_id,
+        "current_trend_kg": round(current, 2) if current is not None else None,
+        "weekly_rate_kg": round(slope * 7, 2) if slope is not None else None,
+        "projection": weight_analytics.project(analysis, target_weight_kg),
+        "points": analysis["points"],
+    }
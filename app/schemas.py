@@ -3,7 +3,7 @@ from enum import Enum
 
 from pydantic import BaseModel, EmailStr, ConfigDict
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from app.models import ActivityTypeEnum, SleepQualityEnum
 
@@ -193,6 +193,13 @@ class NutritionLog(NutritionLogBase):
         orm_mode = True
 
 
+class FoodLookupResult(FoodItemBase):
+    portion: Optional[str] = None
+    source: str
+    samples: int
+    similarity: float
+
+
 class NutritionAnalysisResponse(BaseModel):
     foods: List[FoodItemBase]
     insights: str
@@ -248,3 +255,99 @@ class WeightLog(WeightLogBase):
     log_date: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class WeightTrendPoint(BaseModel):
+    date: date
+    weight_kg: float
+    trend_kg: float
+    moving_avg_7d: float
+    moving_avg_30d: float
+
+
+class WeightProjection(BaseModel):
+    target_weight_kg: Optional[float] = None
+    projected_date: Optional[date] = None
+    weight_in_30_days_kg: float
+
+
+class WeightTrend(BaseModel):
+    user_id: int
+    current_trend_kg: Optional[float] = None
+    weekly_rate_kg: Optional[float] = None
+    projection: Optional[WeightProjection] = None
+    points: List[WeightTrendPoint]
+
+
+class ClockStats(BaseModel):
+    mean_time: str
+    std_minutes: float
+    consistency: float
+
+
+class SleepDebtPoint(BaseModel):
+    date: date
+    duration_minutes: int
+    debt_7d_minutes: int
+
+
+class SleepAnalytics(BaseModel):
+    user_id: int
+    days: int
+    target_minutes: int
+    nights: int
+    average_duration_minutes: Optional[float] = None
+    sleep_debt_7d_minutes: Optional[int] = None
+    total_debt_minutes: Optional[int] = None
+    bedtime: Optional[ClockStats] = None
+    wake_time: Optional[ClockStats] = None
+    midpoint: Optional[ClockStats] = None
+    chronotype: Optional[str] = None
+    quality_distribution: Dict[str, int]
+    daily: List[SleepDebtPoint]
+
+
+class JournalSearchResult(BaseModel):
+    id: int
+    date: date
+    mood: str
+    rank: float
+    highlight: str
+
+
+class JournalSearchPage(BaseModel):
+    results: List[JournalSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class MetricCorrelation(BaseModel):
+    metric: str
+    other_metric: str
+    lag_days: int
+    r: float
+    days: int
+
+
+class LaggedEffect(BaseModel):
+    metric: str
+    threshold: float
+    mood_above: float
+    mood_below: float
+    difference: float
+    days_above: int
+    days_below: int
+    summary: str
+
+
+class CorrelationInsights(BaseModel):
+    user_id: int
+    start_date: date
+    end_date: date
+    days_with_data: int
+    correlations: List[MetricCorrelation]
+    effects: List[LaggedEffect]
@@ -0,0 +1,141 @@
+"""Journal full-text search with keyset pagination.
+
+On Postgres, entries are matched against the generated ``search_vector``
+column (GIN-indexed), ranked with ``ts_rank_cd`` and highlighted with
+``ts_headline``. Other databases (the SQLite used by the benchmarks) fall back
+to a substring match with rank 0.
+"""
+
+import base64
+import binascii
+import json
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import Float, cast, column, func, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from app import models
+
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2"
+)
+FALLBACK_HEADLINE_CHARS = 200
+
+
+def encode_cursor(rank: float, entry_id: int) -> str:
+    raw = json.dumps([rank, entry_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, entry_id = json.loads(raw)
+        return float(rank), int(entry_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+
+
+def _postgres_query(user_id, text, mood, after, limit):
+    entries = models.JournalEntry.__table__
+    query = func.websearch_to_tsquery(models.JOURNAL_SEARCH_CONFIG, text)
+    search_vector = column("search_vector")
+    # ts_rank_cd returns real; ranking, ordering and the keyset comparison all
+    # use it as double precision, which round-trips exactly through the cursor.
+    rank = cast(func.ts_rank_cd(search_vector, query), Float(53))
+
+    # Rank and paginate on ids first so ts_headline only runs on the page.
+    matches = (
+        select(entries.c.id, rank.label("rank"))
+        .select_from(entries)
+        .where(entries.c.user_id == user_id, search_vector.op("@@")(query))
+    )
+    if mood is not None:
+        matches = matches.where(entries.c.mood == mood)
+    if after is not None:
+        matches = matches.where(tuple_(rank, entries.c.id) < tuple_(*after))
+    matches = matches.order_by(rank.desc(), entries.c.id.desc()).limit(limit).subquery()
+
+    return (
+        select(
+            entries.c.id,
+            entries.c.date,
+            entries.c.mood,
+            matches.c.rank,
+            func.ts_headline(
+                models.JOURNAL_SEARCH_CONFIG,
+                func.coalesce(entries.c.content, ""),
+                query,
+                HEADLINE_OPTIONS,
+            ).label("highlight"),
+        )
+        .join(matches, matches.c.id == entries.c.id)
+        .order_by(matches.c.rank.desc(), entries.c.id.desc())
+    )
+
+
+def _fallback_query(user_id, text, mood, after, limit):
+    entries = models.JournalEntry.__table__
+    query = (
+        select(
+            entries.c.id,
+            entries.c.date,
+            entries.c.mood,
+            literal(0.0).label("rank"),
+            entries.c.content.label("highlight"),
+        )
+        .where(entries.c.user_id == user_id, entries.c.content.icontains(text))
+        .order_by(entries.c.id.desc())
+        .limit(limit)
+    )
+    if mood is not None:
+        query = query.where(entries.c.mood == mood)
+    if after is not None:
+        query = query.where(entries.c.id < after[1])
+    return query
+
+
+def _fallback_headline(content: str | None, text: str) -> str:
+    content = content or ""
+    match = re.search(re.escape(text), content, re.IGNORECASE)
+    start = max(match.start() - FALLBACK_HEADLINE_CHARS // 2, 0) if match else 0
+    fragment = content[start : start + FALLBACK_HEADLINE_CHARS]
+    return re.sub(
+        re.escape(text),
+        lambda m: f"<mark>{m.group(0)}</mark>",
+        fragment,
+        flags=re.IGNORECASE,
+    )
+
+
+def search_journal(
+    db: Session,
+    user_id: int,
+    text: str,
+    mood: str | None,
+    cursor: str | None,
+    limit: int,
+) -> dict:
+    after = decode_cursor(cursor) if cursor else None
+    postgres = db.get_bind().dialect.name == "postgresql"
+    build = _postgres_query if postgres else _fallback_query
+    rows = db.execute(build(user_id, text, mood, after, limit + 1)).all()
+
+    results = [
+        {
+            "id": row.id,
+            "date": row.date,
+            "mood": row.mood,
+            "rank": row.rank,
+            "highlight": (
+                row.highlight if postgres else _fallback_headline(row.highlight, text)
+            ),
+        }
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        next_cursor = encode_cursor(last["rank"], last["id"])
+    return {"results": results, "next_cursor": next_cursor}
@@ -0,0 +1,124 @@
+"""Production entry point: ``python -m app.server``.
+
+Runs one uvicorn worker per available CPU (respecting cgroup CPU quotas) on
+uvloop/httptools, and splits DB_MAX_CONNECTIONS across the workers.
+
+Environment:
+    PORT                       listen port (default 8080)
+    WEB_CONCURRENCY            number of workers (default: available CPUs)
+    DB_MAX_CONNECTIONS         total DB connections for all workers
+    GRACEFUL_SHUTDOWN_TIMEOUT  seconds to let in-flight requests finish
+    GEMINI_DRAIN_TIMEOUT       seconds to then wait for Gemini calls (default:
+                               what is left of the shutdown budget)
+"""
+
+import importlib.util
+import math
+import os
+import tempfile
+
+import uvicorn
+
+# Cloud Run sends SIGKILL 10 seconds after SIGTERM. The graceful shutdown and
+# the Gemini drain in main.lifespan run one after the other, so both come out of
+# this budget, leaving a second for the process to exit.
+SHUTDOWN_BUDGET_SECONDS = 9
+DEFAULT_GRACEFUL_SHUTDOWN_TIMEOUT = 5
+
+
+def cgroup_cpu_limit() -> float | None:
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(cpus, 1)
+
+
+def worker_count() -> int:
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(int(os.environ["WEB_CONCURRENCY"]), 1)
+    return available_cpus()
+
+
+def configure_pool(workers: int) -> int:
+    """Sizes each worker's pool so all workers stay within DB_MAX_CONNECTIONS.
+
+    Returns the worker count, reduced if the cap cannot give every worker a
+    connection.
+    """
+    max_connections = os.getenv("DB_MAX_CONNECTIONS")
+    if not max_connections or os.getenv("DB_POOL_SIZE"):
+        return workers
+
+    max_connections = int(max_connections)
+    workers = max(min(workers, max_connections), 1)
+    os.environ["DB_POOL_SIZE"] = str(max(max_connections // workers, 1))
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+    return workers
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def run():
+    workers = configure_pool(worker_count())
+    graceful_timeout = int(
+        os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", DEFAULT_GRACEFUL_SHUTDOWN_TIMEOUT)
+    )
+    os.environ.setdefault(
+        "GEMINI_DRAIN_TIMEOUT",
+        str(max(SHUTDOWN_BUDGET_SECONDS - graceful_timeout, 0)),
+    )
+    if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(
+            prefix="harmonia-metrics-"
+        )
+
+    print(
+        f"Iniciando {workers} worker(s), "
+        f"pool de {os.getenv('DB_POOL_SIZE', 'padrão')} conexão(ões) por worker."
+    )
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8080")),
+        workers=workers,
+        loop="uvloop" if _available("uvloop") else "auto",
+        http="httptools" if _available("httptools") else "auto",
+        timeout_graceful_shutdown=graceful_timeout,
+        # Cloud Run's proxy address isn't fixed, so every hop is trusted and
+        # request.client is client-controlled; see admission.client_address.
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,255 @@
+"""Benchmark suite for the Harmonia API.
+
+    python -m benchmarks run --users 50 --years 2 --output results.json
+    python -m benchmarks compare baseline.json results.json
+
+``run`` seeds a synthetic population, starts the API in a subprocess with the
+Gemini stub installed and reports per-endpoint latency percentiles and
+throughput as JSON.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+
+import httpx
+
+DEFAULT_DATABASE_URL = "sqlite:///bench.db"
+
+
+def _population_config(args):
+    from benchmarks.seed import PopulationConfig
+
+    return PopulationConfig(
+        users=args.users,
+        habits_per_user=args.habits_per_user,
+        years=args.years,
+        water_logs_per_day=args.water_logs_per_day,
+        meals_per_day=args.meals_per_day,
+        seed=args.seed,
+    )
+
+
+def _seed(args):
+    from benchmarks.seed import reset_schema, seed_population
+
+    reset_schema()
+    started = time.perf_counter()
+    population = seed_population(_population_config(args))
+    print(
+        f"Seeded {sum(population.row_counts.values())} rows "
+        f"in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+    return population
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _wait_until_ready(base_url, process, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Benchmark server exited during startup")
+        try:
+            if httpx.get(f"{base_url}/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("Benchmark server did not become ready in time")
+
+
+def _start_server(args):
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.server",
+            "--port",
+            str(args.port),
+            "--gemini-latency-ms",
+            str(args.gemini_latency_ms),
+            "--gemini-jitter-ms",
+            str(args.gemini_jitter_ms),
+        ],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_until_ready(base_url, process)
+    except RuntimeError:
+        process.terminate()
+        raise
+    return process, base_url
+
+
+def cmd_seed(args):
+    population = _seed(args)
+    json.dump(population.row_counts, sys.stdout, indent=2)
+    print()
+
+
+def cmd_run(args):
+    from benchmarks.loadgen import run_all
+    from benchmarks.seed import load_population
+
+    population = load_population() if args.skip_seed else _seed(args)
+    if not population.user_ids:
+        raise SystemExit("No benchmark users found; run without --skip-seed.")
+
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        process, base_url = _start_server(args)
+    try:
+        endpoints = asyncio.run(
+            run_all(
+                base_url,
+                population,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+                seed=args.seed,
+                only=args.only,
+            )
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "population": asdict(_population_config(args)),
+            "rows": population.row_counts,
+            "requests_per_endpoint": args.requests,
+            "concurrency": args.concurrency,
+            "gemini_latency_ms": args.gemini_latency_ms,
+        },
+        "endpoints": endpoints,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+def _delta(old, new):
+    if not old:
+        return "    n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def cmd_compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["endpoints"]
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)["endpoints"]
+
+    regressions = []
+    print(f"{'endpoint':45} {'p95 ms':>21} {'Δ':>8} {'req/s':>19} {'Δ':>8}")
+    for name, new in candidate.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:45} {'(new)':>21}")
+            continue
+        print(
+            f"{name:45} {old['p95_ms']:>9.1f} → {new['p95_ms']:>9.1f} "
+            f"{_delta(old['p95_ms'], new['p95_ms']):>8} "
+            f"{old['throughput_rps']:>8.1f} → {new['throughput_rps']:>8.1f} "
+            f"{_delta(old['throughput_rps'], new['throughput_rps']):>8}"
+        )
+        if (
+            args.max_p95_regression is not None
+            and old["p95_ms"]
+            and (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            > args.max_p95_regression
+        ):
+            regressions.append(name)
+
+    if regressions:
+        raise SystemExit(f"p95 regressions over threshold: {', '.join(regressions)}")
+
+
+def _add_population_args(parser):
+    # Never falls back to DATABASE_URL: seeding drops and recreates every table.
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--habits-per-user", type=int, default=5)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--water-logs-per-day", type=int, default=4)
+    parser.add_argument("--meals-per-day", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Seed the synthetic population")
+    _add_population_args(seed_parser)
+    seed_parser.set_defaults(func=cmd_seed)
+
+    run_parser = commands.add_parser("run", help="Seed and drive every endpoint")
+    _add_population_args(run_parser)
+    run_parser.add_argument("--skip-seed", action="store_true")
+    run_parser.add_argument("--requests", type=int, default=200)
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--warmup", type=int, default=5)
+    run_parser.add_argument("--gemini-latency-ms", type=float, default=800.0)
+    run_parser.add_argument("--gemini-jitter-ms", type=float, default=200.0)
+    run_parser.add_argument("--port", type=int, default=8765)
+    run_parser.add_argument(
+        "--base-url",
+        default=None,
+        help="Target an already running server instead of starting one",
+    )
+    run_parser.add_argument(
+        "--only", nargs="*", help="Only run endpoints whose name contains these"
+    )
+    run_parser.add_argument("--output", default=None)
+    run_parser.set_defaults(func=cmd_run)
+
+    compare_parser = commands.add_parser("compare", help="Diff two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument(
+        "--max-p95-regression",
+        type=float,
+        default=None,
+        help="Exit non-zero if any endpoint's p95 grows by more than this percent",
+    )
+    compare_parser.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    if args.command != "compare":
+        os.environ["DATABASE_URL"] = args.database_url
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
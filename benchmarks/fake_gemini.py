@@ -0,0 +1,113 @@
+import json
+import random
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+HABIT_SUGGESTIONS = [
+    {"name": "Beber 2 litros de água", "icon": "drop.fill"},
+    {"name": "Caminhar 20 minutos", "icon": "figure.walk"},
+    {"name": "Dormir antes das 23h", "icon": "bed.double.fill"},
+]
+
+MEAL_ANALYSIS = {
+    "foods": [
+        {
+            "food_name": "Arroz branco",
+            "calories": 205,
+            "protein": 4.2,
+            "carbs": 44.5,
+            "fat": 0.4,
+        },
+        {
+            "food_name": "Feijão carioca",
+            "calories": 114,
+            "protein": 7.6,
+            "carbs": 20.4,
+            "fat": 0.8,
+        },
+        {
+            "food_name": "Filé de frango grelhado",
+            "calories": 190,
+            "protein": 32.0,
+            "carbs": 0.0,
+            "fat": 6.0,
+        },
+    ],
+    "insights": "Refeição balanceada, rica em proteínas.",
+    "total_calories": 509,
+}
+
+
+@dataclass
+class Latency:
+    """Simulated Gemini latency: a base delay plus uniform jitter."""
+
+    mean_ms: float = 800.0
+    jitter_ms: float = 200.0
+
+    def sleep(self, rng: random.Random):
+        delay = self.mean_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(delay, 0.0) / 1000)
+
+
+class _Chat:
+    def __init__(self, client):
+        self._client = client
+
+    def send_message(self, message):
+        self._client.wait()
+        return SimpleNamespace(text=f"Ótima pergunta! Sobre '{message}': siga firme.")
+
+
+class _Chats:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model, config=None, history=None):
+        return _Chat(self._client)
+
+
+class _Models:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content(self, model, contents, config=None):
+        self._client.wait()
+        if isinstance(contents, list):
+            return SimpleNamespace(text=json.dumps(MEAL_ANALYSIS))
+        return SimpleNamespace(text=json.dumps(HABIT_SUGGESTIONS))
+
+
+class _Files:
+    def __init__(self, client):
+        self._client = client
+
+    def upload(self, file, config=None):
+        self._client.wait(fraction=0.25)
+        return SimpleNamespace(name=f"files/fake-{random.getrandbits(32):08x}")
+
+    def delete(self, name):
+        self._client.wait(fraction=0.1)
+
+
+class FakeClient:
+    """Drop-in stand-in for ``google.genai.Client`` covering the calls main.py makes."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self._rng = random.Random()
+        self.chats = _Chats(self)
+        self.models = _Models(self)
+        self.files = _Files(self)
+
+    def wait(self, fraction: float = 1.0):
+        Latency(
+            self.latency.mean_ms * fraction, self.latency.jitter_ms * fraction
+        ).sleep(self._rng)
+
+
+def install(latency: Latency):
+    from app import gemini
+
+    gemini.client_factory = lambda: FakeClient(latency)
@@ -0,0 +1,393 @@
+import asyncio
+import datetime
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import httpx
+
+from benchmarks.seed import Population
+
+FAKE_JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 2048 + b"\xff\xd9"
+
+
+@dataclass
+class Call:
+    method: str
+    url: str
+    params: dict | None = None
+    json: Any = None
+    files: dict | None = None
+
+
+@dataclass
+class Context:
+    population: Population
+    rng: random.Random
+    deletable_water_ids: list[int] = field(default_factory=list)
+
+    def user_id(self) -> int:
+        return self.rng.choice(self.population.user_ids)
+
+    def habit_id(self) -> int:
+        return self.rng.choice(self.population.habit_ids[self.user_id()])
+
+    def day(self) -> datetime.date:
+        span = (self.population.end_date - self.population.start_date).days
+        return self.population.start_date + datetime.timedelta(
+            days=self.rng.randint(0, span)
+        )
+
+    def moment(self) -> str:
+        return datetime.datetime.combine(
+            self.day(), datetime.time(self.rng.randint(6, 21))
+        ).isoformat()
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[Context], Call]
+
+
+def _sleep_call(ctx: Context) -> Call:
+    start = datetime.datetime.combine(ctx.day(), datetime.time(23))
+    end = start + datetime.timedelta(minutes=ctx.rng.randint(300, 540))
+    return Call(
+        "POST",
+        f"/users/{ctx.user_id()}/sleep",
+        json={
+            "start_time": start.isoformat(),
+            "end_time": end.isoformat(),
+            "quality": ctx.rng.choice(["Ruim", "Ok", "Bom"]),
+        },
+    )
+
+
+def _nutrition_call(ctx: Context) -> Call:
+    items = [
+        {
+            "food_name": "Arroz branco",
+            "calories": 205,
+            "protein": 4.2,
+            "carbs": 44.5,
+            "fat": 0.4,
+        },
+        {
+            "food_name": "Feijão carioca",
+            "calories": 114,
+            "protein": 7.6,
+            "carbs": 20.4,
+            "fat": 0.8,
+        },
+    ]
+    return Call(
+        "POST",
+        "/nutrition",
+        json={
+            "user_id": ctx.user_id(),
+            "log_date": ctx.moment(),
+            "total_calories": 319,
+            "total_protein": 11.8,
+            "total_carbs": 64.9,
+            "total_fat": 1.2,
+            "insights": None,
+            "items": items,
+        },
+    )
+
+
+def _delete_water_call(ctx: Context) -> Call:
+    log_id = ctx.deletable_water_ids.pop() if ctx.deletable_water_ids else 0
+    return Call("DELETE", f"/water/{log_id}")
+
+
+SCENARIOS = [
+    Scenario("GET /", lambda ctx: Call("GET", "/")),
+    Scenario(
+        "POST /users/login",
+        lambda ctx: Call(
+            "POST",
+            "/users/login",
+            json={
+                "name": "Usuário Benchmark",
+                "email": f"bench-{ctx.rng.randrange(len(ctx.population.user_ids))}"
+                "@harmonia.dev",
+            },
+        ),
+    ),
+    Scenario(
+        "POST /habits/{habit_def_id}/toggle",
+        lambda ctx: Call(
+            "POST",
+            f"/habits/{ctx.habit_id()}/toggle",
+            params={"date_str": ctx.day().isoformat()},
+        ),
+    ),
+    Scenario(
+        "GET /habits/{habit_def_id}/history",
+        lambda ctx: Call("GET", f"/habits/{ctx.habit_id()}/history"),
+    ),
+    Scenario(
+        "POST /coach/ask",
+        lambda ctx: Call(
+            "POST",
+            "/coach/ask",
+            json={
+                "current_message": "Como posso dormir melhor?",
+                "history": [
+                    {"role": "user", "content": "Oi!"},
+                    {"role": "model", "content": "Olá! Como posso ajudar?"},
+                ],
+                "user_id": ctx.user_id(),
+            },
+        ),
+    ),
+    Scenario(
+        "GET /dashboard/user/{user_id}",
+        lambda ctx: Call(
+            "GET",
+            f"/dashboard/user/{ctx.user_id()}",
+            params={"date_str": ctx.day().isoformat()},
+        ),
+    ),
+    Scenario(
+        "GET /users/{user_id}", lambda ctx: Call("GET", f"/users/{ctx.user_id()}")
+    ),
+    Scenario(
+        "PATCH /users/{user_id}",
+        lambda ctx: Call(
+            "PATCH", f"/users/{ctx.user_id()}", json={"main_goal": "Dormir melhor"}
+        ),
+    ),
+    Scenario(
+        "POST /onboarding/suggest-habits",
+        lambda ctx: Call(
+            "POST", "/onboarding/suggest-habits", json={"objective": "Perder peso"}
+        ),
+    ),
+    Scenario(
+        "POST /users/{user_id}/journal",
+        lambda ctx: Call(
+            "POST",
+            f"/users/{ctx.user_id()}/journal",
+            json={
+                "mood": ctx.rng.choice(["feliz", "bem", "neutro", "mal", "triste"]),
+                "content": "Entrada gerada pelo benchmark.",
+                "date": ctx.day().isoformat(),
+            },
+        ),
+    ),
+    Scenario(
+        "GET /journal_entries/{user_id}",
+        lambda ctx: Call("GET", f"/journal_entries/{ctx.user_id()}"),
+    ),
+    Scenario(
+        "POST /activities/",
+        lambda ctx: Call(
+            "POST",
+            "/activities/",
+            json={
+                "activity_type": "Corrida",
+                "duration": 35.0,
+                "distance": 6.2,
+                "date": ctx.moment(),
+                "owner_id": ctx.user_id(),
+            },
+        ),
+    ),
+    Scenario(
+        "GET /users/{user_id}/activities/",
+        lambda ctx: Call("GET", f"/users/{ctx.user_id()}/activities/"),
+    ),
+    Scenario(
+        "POST /users/{user_id}/habits",
+        lambda ctx: Call(
+            "POST",
+            f"/users/{ctx.user_id()}/habits",
+            json={"name": "Hábito do benchmark", "icon": "star.fill"},
+        ),
+    ),
+    Scenario(
+        "POST /nutrition/analyze-meal",
+        lambda ctx: Call(
+            "POST",
+            "/nutrition/analyze-meal",
+            files={"image": ("refeicao.jpg", FAKE_JPEG, "image/jpeg")},
+        ),
+    ),
+    Scenario("POST /nutrition", _nutrition_call),
+    Scenario(
+        "GET /nutrition/lookup",
+        lambda ctx: Call(
+            "GET",
+            "/nutrition/lookup",
+            params={"q": ctx.rng.choice(["arroz", "feijao", "frango grelhado", "ovo"])},
+        ),
+    ),
+    Scenario(
+        "POST /users/{user_id}/water",
+        lambda ctx: Call(
+            "POST", f"/users/{ctx.user_id()}/water", json={"amount_ml": 250}
+        ),
+    ),
+    Scenario(
+        "GET /users/{user_id}/water",
+        lambda ctx: Call(
+            "GET",
+            f"/users/{ctx.user_id()}/water",
+            params={"log_date": ctx.day().isoformat()},
+        ),
+    ),
+    Scenario("DELETE /water/{log_id}", _delete_water_call),
+    Scenario("POST /users/{user_id}/sleep", _sleep_call),
+    Scenario(
+        "GET /users/{user_id}/sleep",
+        lambda ctx: Call("GET", f"/users/{ctx.user_id()}/sleep"),
+    ),
+    Scenario(
+        "POST /users/{user_id}/weight",
+        lambda ctx: Call(
+            "POST",
+            f"/users/{ctx.user_id()}/weight",
+            json={"weight_kg": round(ctx.rng.uniform(55, 110), 1)},
+        ),
+    ),
+    Scenario(
+        "GET /users/{user_id}/weight",
+        lambda ctx: Call("GET", f"/users/{ctx.user_id()}/weight"),
+    ),
+    Scenario(
+        "GET /users/{user_id}/journal/search",
+        lambda ctx: Call(
+            "GET",
+            f"/users/{ctx.user_id()}/journal/search",
+            params={"q": ctx.rng.choice(["dormi", "treinar", "amigos", "livro"])},
+        ),
+    ),
+    Scenario(
+        "GET /users/{user_id}/sleep/analytics",
+        lambda ctx: Call(
+            "GET",
+            f"/users/{ctx.user_id()}/sleep/analytics",
+            params={"days": ctx.rng.choice([7, 30, 90, 365])},
+        ),
+    ),
+    Scenario(
+        "GET /users/{user_id}/weight/trend",
+        lambda ctx: Call(
+            "GET",
+            f"/users/{ctx.user_id()}/weight/trend",
+            params={"target_weight_kg": round(ctx.rng.uniform(55, 110), 1)},
+        ),
+    ),
+    Scenario(
+        "GET /users/{user_id}/insights/correlations",
+        lambda ctx: Call(
+            "GET",
+            f"/users/{ctx.user_id()}/insights/correlations",
+            params={"start_date": ctx.day().isoformat()},
+        ),
+    ),
+    Scenario(
+        "GET /users/{user_id}/export",
+        lambda ctx: Call(
+            "GET",
+            f"/users/{ctx.user_id()}/export",
+            params={
+                "format": ctx.rng.choice(["ndjson", "csv"]),
+                "gzip": ctx.rng.choice(["true", "false"]),
+            },
+        ),
+    ),
+    Scenario("GET /metrics", lambda ctx: Call("GET", "/metrics")),
+]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+async def _send(client: httpx.AsyncClient, call: Call) -> int:
+    response = await client.request(
+        call.method, call.url, params=call.params, json=call.json, files=call.files
+    )
+    return response.status_code
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ctx: Context,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict:
+    for _ in range(warmup):
+        await _send(client, scenario.build(ctx))
+
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            call = scenario.build(ctx)
+            start = time.perf_counter()
+            try:
+                status = await _send(client, call)
+            except httpx.HTTPError:
+                status = 0
+            latencies.append((time.perf_counter() - start) * 1000)
+            if not 200 <= status < 300:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+async def run_all(
+    base_url: str,
+    population: Population,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+    only: list[str] | None = None,
+) -> dict[str, dict]:
+    ctx = Context(population=population, rng=random.Random(seed))
+    ctx.deletable_water_ids = list(population.water_log_ids)
+    ctx.rng.shuffle(ctx.deletable_water_ids)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=120
+    ) as client:
+        for scenario in SCENARIOS:
+            if only and not any(pattern in scenario.name for pattern in only):
+                continue
+            results[scenario.name] = await run_scenario(
+                client, scenario, ctx, requests, concurrency, warmup
+            )
+    return results
@@ -0,0 +1,205 @@
+"""Query-count regression guard.
+
+    python -m benchmarks.query_budget
+
+Seeds the database at growing sizes, calls every route through the ASGI app
+and counts the SQL statements each request issues. Fails when a route's
+query count grows with the data size (an N+1) or exceeds its budget. Also
+checks that rate-limited writes don't burn their Idempotency-Key.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+# Maximum SQL statements a single request may issue. Every route in
+# benchmarks.loadgen.SCENARIOS must be listed here.
+QUERY_BUDGETS = {
+    "GET /": 0,
+    "POST /users/login": 1,
+    "POST /habits/{habit_def_id}/toggle": 4,
+    "GET /habits/{habit_def_id}/history": 1,
+    "POST /coach/ask": 0,
+    "GET /dashboard/user/{user_id}": 3,
+    "GET /users/{user_id}": 1,
+    "PATCH /users/{user_id}": 3,
+    "POST /onboarding/suggest-habits": 0,
+    "POST /users/{user_id}/journal": 4,
+    "GET /journal_entries/{user_id}": 1,
+    "POST /activities/": 3,
+    "GET /users/{user_id}/activities/": 1,
+    "POST /users/{user_id}/habits": 3,
+    "POST /nutrition/analyze-meal": 2,
+    "POST /nutrition": 4,
+    "GET /nutrition/lookup": 2,
+    "POST /users/{user_id}/water": 2,
+    "GET /users/{user_id}/water": 1,
+    "DELETE /water/{log_id}": 2,
+    "POST /users/{user_id}/sleep": 3,
+    "GET /users/{user_id}/sleep": 1,
+    "POST /users/{user_id}/weight": 3,
+    "GET /users/{user_id}/weight": 1,
+    "GET /users/{user_id}/journal/search": 1,
+    "GET /users/{user_id}/sleep/analytics": 2,
+    "GET /users/{user_id}/weight/trend": 2,
+    "GET /users/{user_id}/insights/correlations": 2,
+    "GET /users/{user_id}/export": 11,
+    "GET /metrics": 0,
+}
+
+
+def check_idempotency(client):
+    """A 429 must release the Idempotency-Key: the retry runs, and only its
+    final response is replayed."""
+    from app import admission
+
+    url = "/onboarding/suggest-habits"
+    body = {"objective": "Dormir melhor"}
+    headers = {"Idempotency-Key": "query-budget-429"}
+    limiter = admission.ai_rate_limiter
+    failures = []
+    try:
+        admission.ai_rate_limiter = admission.TokenBucketLimiter(
+            "ai", rate_per_minute=1, burst=1
+        )
+        client.post(url, json=body)
+        limited = client.post(url, json=body, headers=headers)
+        # A fresh bucket stands in for waiting until it refills.
+        admission.ai_rate_limiter = admission.TokenBucketLimiter("ai")
+        retried = client.post(url, json=body, headers=headers)
+        replayed = client.post(url, json=body, headers=headers)
+    finally:
+        admission.ai_rate_limiter = limiter
+
+    if limited.status_code != 429:
+        failures.append(f"idempotency: expected 429, got {limited.status_code}")
+    if retried.status_code != 200 or "idempotent-replayed" in retried.headers:
+        failures.append("idempotency: retry after a 429 replayed the 429")
+    if replayed.headers.get("idempotent-replayed") != "true":
+        failures.append("idempotency: successful retry was not stored")
+    return failures
+
+
+def measure(scales, users, calls, seed):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app import database, food_index
+    from app.analytics import correlations, sleep, weight
+    from benchmarks import fake_gemini
+    from benchmarks.loadgen import SCENARIOS, Context
+    from benchmarks.seed import PopulationConfig, reset_schema, seed_population
+    from main import app
+
+    fake_gemini.install(fake_gemini.Latency(0, 0))
+    counter = {"queries": 0}
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        counter["queries"] += 1
+
+    event.listen(database.engine, "before_cursor_execute", count_query)
+    counts = {scenario.name: [] for scenario in SCENARIOS}
+    try:
+        with TestClient(app) as client:
+            for years in scales:
+                reset_schema()
+                # In-process caches still hold the previous database's data;
+                # clear them so cold paths are measured at every scale.
+                food_index.index.reset()
+                for cache in (
+                    weight.trend_cache,
+                    sleep.analytics_cache,
+                    correlations.insights_cache,
+                ):
+                    cache.clear()
+                population = seed_population(
+                    PopulationConfig(users=users, years=years, seed=seed)
+                )
+                ctx = Context(population=population, rng=random.Random(seed))
+                ctx.deletable_water_ids = list(population.water_log_ids)
+                for scenario in SCENARIOS:
+                    worst = 0
+                    for _ in range(calls):
+                        call = scenario.build(ctx)
+                        counter["queries"] = 0
+                        response = client.request(
+                            call.method,
+                            call.url,
+                            params=call.params,
+                            json=call.json,
+                            files=call.files,
+                        )
+                        if response.status_code >= 500:
+                            raise RuntimeError(
+                                f"{scenario.name} failed with {response.status_code}"
+                            )
+                        worst = max(worst, counter["queries"])
+                    counts[scenario.name].append(worst)
+            failures = check_idempotency(client)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", count_query)
+    return counts, failures
+
+
+def check(counts, budgets):
+    failures = []
+    for name, per_scale in counts.items():
+        budget = budgets.get(name)
+        if budget is None:
+            failures.append(f"{name}: no query budget declared")
+        elif max(per_scale) > budget:
+            failures.append(f"{name}: {max(per_scale)} queries, budget is {budget}")
+        if per_scale[-1] > per_scale[0]:
+            failures.append(
+                f"{name}: query count grows with data size "
+                f"({' -> '.join(map(str, per_scale))})"
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.query_budget")
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Database to seed (dropped and recreated); defaults to a temp SQLite file",
+    )
+    parser.add_argument(
+        "--years",
+        type=float,
+        nargs="+",
+        default=[0.1, 0.5, 1.0],
+        help="Data sizes to compare, in years of history per user",
+    )
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = (
+            args.database_url or f"sqlite:///{os.path.join(tmp, 'budget.db')}"
+        )
+        os.environ["AI_RATE_LIMIT_PER_MINUTE"] = "0"
+        counts, failures = measure(
+            sorted(args.years), args.users, args.calls, args.seed
+        )
+
+    header = " ".join(f"{years:>6g}y" for years in sorted(args.years))
+    print(f"{'endpoint':45} {header} {'budget':>7}")
+    for name, per_scale in counts.items():
+        row = " ".join(f"{count:>7}" for count in per_scale)
+        print(f"{name:45} {row} {QUERY_BUDGETS.get(name, '-'):>7}")
+
+    failures += check(counts, QUERY_BUDGETS)
+    if failures:
+        print("\nFailures:", file=sys.stderr)
+        for failure in failures:
+            print(f"  - {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import datetime
+import random
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, insert, select
+
+from app import database, food_index, models
+
+BATCH_SIZE = 5000
+
+HABITS = [
+    ("Beber água", "drop.fill"),
+    ("Meditar", "brain.head.profile"),
+    ("Ler 10 páginas", "book.fill"),
+    ("Caminhar", "figure.walk"),
+    ("Alongar", "figure.cooldown"),
+    ("Dormir cedo", "bed.double.fill"),
+    ("Comer frutas", "leaf.fill"),
+    ("Sem açúcar", "xmark.circle"),
+]
+
+FOODS = [
+    ("Arroz branco", 205, 4.2, 44.5, 0.4),
+    ("Feijão carioca", 114, 7.6, 20.4, 0.8),
+    ("Filé de frango grelhado", 190, 32.0, 0.0, 6.0),
+    ("Ovo cozido", 78, 6.3, 0.6, 5.3),
+    ("Banana prata", 98, 1.3, 26.0, 0.1),
+    ("Pão francês", 150, 4.0, 29.0, 1.6),
+    ("Salada verde", 25, 1.5, 4.0, 0.3),
+    ("Iogurte natural", 92, 6.0, 7.0, 4.5),
+]
+
+MOODS = ["feliz", "bem", "neutro", "mal", "triste"]
+GOALS = ["Perder peso", "Ganhar massa", "Dormir melhor", "Reduzir estresse"]
+JOURNAL_SNIPPETS = [
+    "Dia produtivo no trabalho, consegui treinar à noite.",
+    "Dormi mal e fiquei cansado a tarde toda.",
+    "Encontrei amigos e me senti muito bem.",
+    "Semana corrida, preciso descansar mais.",
+    "Comecei um livro novo e meditei pela manhã.",
+]
+
+
+@dataclass
+class PopulationConfig:
+    users: int = 20
+    habits_per_user: int = 5
+    years: float = 1.0
+    completion_rate: float = 0.6
+    journal_rate: float = 0.7
+    activity_rate: float = 0.4
+    weight_rate: float = 0.5
+    water_logs_per_day: int = 4
+    meals_per_day: int = 2
+    seed: int = 42
+
+
+@dataclass
+class Population:
+    start_date: datetime.date
+    end_date: datetime.date
+    user_ids: list[int] = field(default_factory=list)
+    habit_ids: dict[int, list[int]] = field(default_factory=dict)
+    water_log_ids: list[int] = field(default_factory=list)
+    row_counts: dict[str, int] = field(default_factory=dict)
+
+
+def reset_schema():
+    database.Base.metadata.drop_all(database.engine)
+    database.Base.metadata.create_all(database.engine)
+
+
+def _insert(db, model, rows, returning=None):
+    ids = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start : start + BATCH_SIZE]
+        if returning is None:
+            db.execute(insert(model), batch)
+        else:
+            ids.extend(
+                db.scalars(
+                    insert(model).returning(returning, sort_by_parameter_order=True),
+                    batch,
+                )
+            )
+    return ids
+
+
+def _utc(day: datetime.date, hour: int, minute: int = 0) -> datetime.datetime:
+    return datetime.datetime.combine(
+        day, datetime.time(hour, minute), tzinfo=datetime.timezone.utc
+    )
+
+
+def seed_population(config: PopulationConfig) -> Population:
+    rng = random.Random(config.seed)
+    end_date = datetime.date.today()
+    days = max(int(config.years * 365), 1)
+    start_date = end_date - datetime.timedelta(days=days - 1)
+    calendar = [start_date + datetime.timedelta(days=i) for i in range(days)]
+    population = Population(start_date=start_date, end_date=end_date)
+
+    with database.SessionLocal() as db:
+        population.user_ids = _insert(
+            db,
+            models.User,
+            [
+                {
+                    "name": f"Usuário Benchmark {i}",
+                    "email": f"bench-{i}@harmonia.dev",
+                    "signup_date": start_date,
+                    "main_goal": rng.choice(GOALS),
+                    "initial_weight_kg": round(rng.uniform(55, 110), 1),
+                    "plan_type": "Gratuito",
+                }
+                for i in range(config.users)
+            ],
+            returning=models.User.id,
+        )
+
+        habit_rows = [
+            {"user_id": user_id, "name": name, "icon": icon}
+            for user_id in population.user_ids
+            for name, icon in rng.sample(
+                HABITS, min(config.habits_per_user, len(HABITS))
+            )
+        ]
+        habit_ids = _insert(
+            db, models.HabitDefinition, habit_rows, returning=models.HabitDefinition.id
+        )
+        for row, habit_id in zip(habit_rows, habit_ids):
+            population.habit_ids.setdefault(row["user_id"], []).append(habit_id)
+
+        completions, journal, activities = [], [], []
+        water, sleep, weight, meals = [], [], [], []
+        for user_id in population.user_ids:
+            weight_kg = rng.uniform(55, 110)
+            for day in calendar:
+                for habit_id in population.habit_ids.get(user_id, []):
+                    if rng.random() < config.completion_rate:
+                        completions.append({"habit_id": habit_id, "date": day})
+                if rng.random() < config.journal_rate:
+                    journal.append(
+                        {
+                            "user_id": user_id,
+                            "date": day,
+                            "mood": rng.choice(MOODS),
+                            "content": rng.choice(JOURNAL_SNIPPETS),
+                        }
+                    )
+                if rng.random() < config.activity_rate:
+                    activity_type = rng.choice(list(models.ActivityTypeEnum))
+                    activities.append(
+                        {
+                            "owner_id": user_id,
+                            "activity_type": activity_type.value,
+                            "duration": round(rng.uniform(20, 90), 1),
+                            "distance": (
+                                None
+                                if activity_type
+                                == models.ActivityTypeEnum.strengthTraining
+                                else round(rng.uniform(2, 15), 2)
+                            ),
+                            "date": datetime.datetime.combine(
+                                day, datetime.time(rng.randint(6, 20))
+                            ),
+                        }
+                    )
+                for _ in range(config.water_logs_per_day):
+                    water.append(
+                        {
+                            "user_id": user_id,
+                            "amount_ml": rng.choice([200, 250, 300, 500]),
+                            "log_date": _utc(
+                                day, rng.randint(7, 22), rng.randint(0, 59)
+                            ),
+                        }
+                    )
+                bedtime = _utc(day, 22) + datetime.timedelta(
+                    minutes=rng.randint(0, 180)
+                )
+                duration = rng.randint(300, 540)
+                sleep.append(
+                    {
+                        "user_id": user_id,
+                        "start_time": bedtime,
+                        "end_time": bedtime + datetime.timedelta(minutes=duration),
+                        "duration_minutes": duration,
+                        "quality": rng.choice(list(models.SleepQualityEnum)).value,
+                    }
+                )
+                if rng.random() < config.weight_rate:
+                    weight_kg += rng.gauss(-0.02, 0.3)
+                    weight.append(
+                        {
+                            "user_id": user_id,
+                            "weight_kg": round(weight_kg, 1),
+                            "log_date": _utc(day, 7),
+                        }
+                    )
+                for meal in range(config.meals_per_day):
+                    items = rng.sample(FOODS, rng.randint(1, 3))
+                    meals.append(
+                        (
+                            {
+                                "user_id": user_id,
+                                "log_date": _utc(day, 12 + meal * 7),
+                                "total_calories": sum(f[1] for f in items),
+                                "total_protein": sum(f[2] for f in items),
+                                "total_carbs": sum(f[3] for f in items),
+                                "total_fat": sum(f[4] for f in items),
+                                "insights": None,
+                            },
+                            items,
+                        )
+                    )
+
+        _insert(db, models.HabitCompletion, completions)
+        _insert(db, models.JournalEntry, journal)
+        _insert(db, models.ActivityLog, activities)
+        population.water_log_ids = _insert(
+            db, models.WaterLog, water, returning=models.WaterLog.id
+        )
+        _insert(db, models.SleepLog, sleep)
+        _insert(db, models.WeightLog, weight)
+        log_ids = _insert(
+            db,
+            models.NutritionLog,
+            [log for log, _ in meals],
+            returning=models.NutritionLog.id,
+        )
+        food_items = [
+            {
+                "nutrition_log_id": log_id,
+                "food_name": name,
+                "calories": calories,
+                "protein": protein,
+                "carbs": carbs,
+                "fat": fat,
+            }
+            for log_id, (_, items) in zip(log_ids, meals)
+            for name, calories, protein, carbs, fat in items
+        ]
+        _insert(db, models.FoodItem, food_items)
+        db.commit()
+        references = food_index.seed_references(db)
+
+    population.row_counts = {
+        "users": len(population.user_ids),
+        "habit_definitions": len(habit_rows),
+        "habit_completions": len(completions),
+        "journal_entries": len(journal),
+        "activity_logs": len(activities),
+        "water_logs": len(water),
+        "sleep_logs": len(sleep),
+        "weight_logs": len(weight),
+        "nutrition_logs": len(meals),
+        "food_items": len(food_items),
+        "food_references": references,
+    }
+    return population
+
+
+def load_population() -> Population:
+    """Rebuilds the id lookup for a database seeded by an earlier run."""
+    with database.SessionLocal() as db:
+        first_day = db.scalar(select(func.min(models.HabitCompletion.date)))
+        population = Population(
+            start_date=first_day or datetime.date.today(),
+            end_date=datetime.date.today(),
+        )
+        population.user_ids = list(
+            db.scalars(
+                select(models.User.id)
+                .where(models.User.email.like("bench-%"))
+                .order_by(models.User.id)
+            )
+        )
+        for habit_id, user_id in db.execute(
+            select(models.HabitDefinition.id, models.HabitDefinition.user_id).where(
+                models.HabitDefinition.user_id.in_(population.user_ids)
+            )
+        ):
+            population.habit_ids.setdefault(user_id, []).append(habit_id)
+        population.water_log_ids = list(
+            db.scalars(
+                select(models.WaterLog.id).where(
+                    models.WaterLog.user_id.in_(population.user_ids)
+                )
+            )
+        )
+    return population
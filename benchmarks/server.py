@@ -0,0 +1,38 @@
+"""Serves the API with the Gemini stub installed; spawned by ``python -m benchmarks run``."""
+
+import argparse
+import os
+
+import uvicorn
+
+from benchmarks import fake_gemini
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--gemini-latency-ms", type=float, default=800.0)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=200.0)
+    parser.add_argument(
+        "--ai-rate-limit-per-minute",
+        type=float,
+        default=0,
+        help="Per-client AI rate limit; 0 disables it (a few synthetic users "
+        "would otherwise be throttled)",
+    )
+    args = parser.parse_args()
+
+    os.environ["AI_RATE_LIMIT_PER_MINUTE"] = str(args.ai_rate_limit_per_minute)
+
+    fake_gemini.install(
+        fake_gemini.Latency(args.gemini_latency_ms, args.gemini_jitter_ms)
+    )
+
+    from main import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
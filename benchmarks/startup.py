@@ -0,0 +1,154 @@
+"""Cold-start benchmark.
+
+    python -m benchmarks.startup --output benchmarks/baselines/startup.json
+
+Measures, in fresh interpreters, how long ``import main`` takes and how long a
+server process takes from launch to its first 200 response, plus the latency
+of the first database-backed request.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+print(int("google.genai" in sys.modules))
+"""
+
+
+def measure_import(runs):
+    timings, loads_genai = [], False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        timings.append(float(output[0]) * 1000)
+        loads_genai = loads_genai or output[1] == "1"
+    return timings, loads_genai
+
+
+def slowest_imports(limit):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    entries = []
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        # Only modules imported directly by main: deeper ones are already
+        # included in their parent's cumulative time.
+        if match and len(match.group(2)) == 3:
+            entries.append((int(match.group(1)) / 1000, match.group(3)))
+    entries.sort(reverse=True)
+    return [
+        {"module": module, "cumulative_ms": round(ms, 1)}
+        for ms, module in entries[:limit]
+    ]
+
+
+def measure_first_request(port):
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            try:
+                if httpx.get(f"{base_url}/", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        first_200 = time.perf_counter() - started
+
+        request_started = time.perf_counter()
+        httpx.get(f"{base_url}/users/1", timeout=10)
+        first_db_request = time.perf_counter() - request_started
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return first_200 * 1000, first_db_request * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Database the server connects to; defaults to a temp SQLite file",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = (
+            args.database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        )
+        if args.database_url is None:
+            from app import database, models  # noqa: F401
+
+            database.Base.metadata.create_all(database.engine)
+
+        import_ms, loads_genai = measure_import(args.runs)
+        first_200_ms, first_db_ms = [], []
+        for _ in range(args.runs):
+            ready, first_db = measure_first_request(args.port)
+            first_200_ms.append(ready)
+            first_db_ms.append(first_db)
+        slowest = slowest_imports(10)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "runs": args.runs,
+        },
+        "import_main_ms": round(statistics.median(import_ms), 1),
+        "time_to_first_200_ms": round(statistics.median(first_200_ms), 1),
+        "first_db_request_ms": round(statistics.median(first_db_ms), 1),
+        "imports_google_genai_at_startup": loads_genai,
+        "slowest_imports": slowest,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
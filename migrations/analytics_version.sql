@@ -0,0 +1,5 @@
+-- Per-user version of the cached analytics (app/analytics/cache.py).
+-- Databases created with Base.metadata.create_all() already have it.
+
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS analytics_version INTEGER NOT NULL DEFAULT 0;
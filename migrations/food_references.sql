@@ -0,0 +1,13 @@
+-- Reference foods for the local food index (app/food_index.py).
+-- Databases created with Base.metadata.create_all() already have it.
+-- Fill it afterwards with: python -m app.food_index seed
+
+CREATE TABLE IF NOT EXISTS food_references (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(120) NOT NULL UNIQUE,
+    portion VARCHAR(60),
+    calories DOUBLE PRECISION NOT NULL,
+    protein DOUBLE PRECISION NOT NULL,
+    carbs DOUBLE PRECISION NOT NULL,
+    fat DOUBLE PRECISION NOT NULL
+);
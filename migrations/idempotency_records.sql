@@ -0,0 +1,22 @@
+-- Stored responses for the Idempotency-Key middleware (app/idempotency.py).
+-- Databases created with Base.metadata.create_all() already have it.
+
+CREATE TABLE IF NOT EXISTS idempotency_records (
+    key VARCHAR(255) PRIMARY KEY,
+    fingerprint VARCHAR(64) NOT NULL,
+    status_code INTEGER,
+    headers TEXT,
+    body BYTEA,
+    route VARCHAR(255),
+    locked_until TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Tables created before the route label and the processing lease were added.
+ALTER TABLE idempotency_records
+    ADD COLUMN IF NOT EXISTS route VARCHAR(255),
+    ADD COLUMN IF NOT EXISTS locked_until TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS ix_idempotency_records_expires_at
+    ON idempotency_records (expires_at);
@@ -0,0 +1,10 @@
+-- Full-text search over journal entries (GET /users/{user_id}/journal/search).
+-- New databases get this from the after_create hooks in app/models.py.
+-- Adding a stored generated column rewrites the table; run it off-peak.
+
+ALTER TABLE journal_entries
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('portuguese', coalesce(content, ''))) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_journal_entries_search_vector
+    ON journal_entries USING GIN (search_vector);